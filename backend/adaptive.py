@@ -0,0 +1,194 @@
+import os
+import time
+
+import metrics
+from ocr_utils import clean_ocr_text
+from preprocess import MAX_PIXELS, TIER_ORDER, choose_tier, preprocess, report_timings
+
+OCR_TARGET_CONFIDENCE = float(os.getenv("OCR_TARGET_CONFIDENCE", "0.75"))
+OCR_ESCALATE_CONFIDENCE = float(os.getenv("OCR_ESCALATE_CONFIDENCE", "0.5"))
+OCR_MAX_PASSES = int(os.getenv("OCR_MAX_PASSES", "3"))
+OCR_WORD_MIN_CONF = float(os.getenv("OCR_WORD_MIN_CONF", "0.55"))
+OCR_FAST_PIXELS = int(os.getenv("OCR_FAST_PIXELS", "1000000"))
+TESSERACT_CMD = os.getenv("TESSERACT_CMD") or (
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe" if os.name == "nt" else None
+)
+
+# Cheapest first; each step only runs when the best mean word confidence so far is below the target.
+# "medium" is skipped when the fast pass scored under min_prior: such frames need the full pipeline.
+LADDER = (
+    {"name": "fast", "tier": "cheap", "psm": 6, "max_pixels": OCR_FAST_PIXELS},
+    {"name": "medium", "tier": "medium", "psm": 6, "max_pixels": MAX_PIXELS, "min_prior": OCR_ESCALATE_CONFIDENCE},
+    {"name": "full", "tier": "full", "psm": 6, "max_pixels": MAX_PIXELS},
+    {"name": "sparse", "tier": "full", "psm": 11, "max_pixels": MAX_PIXELS},
+)
+
+
+def load_pytesseract():
+    """Import pytesseract on first use; it pulls in pandas whenever pandas is installed."""
+    import pytesseract
+
+    if TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    return pytesseract
+
+
+def pytesseract_reader(lang="eng"):
+    """read(image, psm) -> [{"text", "confidence", "box", "line"}] using pytesseract.image_to_data."""
+    def read(image, psm):
+        from PIL import Image
+
+        pytesseract = load_pytesseract()
+        data = pytesseract.image_to_data(
+            Image.fromarray(image), lang=lang, config=f"--oem 3 --psm {psm}", output_type=pytesseract.Output.DICT
+        )
+        words = []
+        for i, text in enumerate(data.get("text", [])):
+            text = (text or "").strip()
+            try:
+                conf = float(data["conf"][i])
+            except (KeyError, ValueError):
+                conf = -1
+            if not text or conf < 0:
+                continue
+            words.append({
+                "text": text,
+                "confidence": conf / 100,
+                "box": [data["left"][i], data["top"][i], data["width"][i], data["height"][i]],
+                "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+            })
+        return words
+    return read
+
+
+def tesserocr_reader(engine):
+    """Same contract as pytesseract_reader, on an already-initialised tesserocr.PyTessBaseAPI."""
+    def read(image, psm):
+        from PIL import Image
+        from tesserocr import RIL, iterate_level
+
+        engine.SetPageSegMode(psm)
+        engine.SetImage(Image.fromarray(image))
+        engine.Recognize()
+        iterator = engine.GetIterator()
+        if iterator is None:
+            return []
+        words = []
+        line = 0
+        for word in iterate_level(iterator, RIL.WORD):
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line += 1
+            text = (word.GetUTF8Text(RIL.WORD) or "").strip()
+            conf = word.Confidence(RIL.WORD)
+            if not text or conf < 0:
+                continue
+            x1, y1, x2, y2 = word.BoundingBox(RIL.WORD)
+            words.append({"text": text, "confidence": conf / 100, "box": [x1, y1, x2 - x1, y2 - y1], "line": line})
+        return words
+    return read
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 3) if values else 0.0
+
+
+def _union(boxes):
+    x1 = min(b[0] for b in boxes)
+    y1 = min(b[1] for b in boxes)
+    x2 = max(b[0] + b[2] for b in boxes)
+    y2 = max(b[1] + b[3] for b in boxes)
+    return [x1, y1, x2 - x1, y2 - y1]
+
+
+def build_lines(words, scale=1.0):
+    """Group words into lines; boxes are scaled back to the coordinates of the input image."""
+    lines = {}
+    for word in words:
+        box = [int(round(v * scale)) for v in word["box"]]
+        lines.setdefault(word["line"], []).append(
+            {"text": word["text"], "confidence": round(word["confidence"], 3), "box": box}
+        )
+    return [
+        {
+            "text": " ".join(w["text"] for w in line),
+            "confidence": _mean([w["confidence"] for w in line]),
+            "box": _union([w["box"] for w in line]),
+            "words": line,
+        }
+        for line in lines.values()
+    ]
+
+
+def confident_text(lines, min_conf=OCR_WORD_MIN_CONF):
+    """Text of the words at or above min_conf, cleaned like ocr_utils.ocr_with_confidence."""
+    return clean_ocr_text(
+        " ".join(w["text"] for w in line["words"] if w["confidence"] >= min_conf) for line in lines
+    )
+
+
+def adaptive_ocr(img, read, target=OCR_TARGET_CONFIDENCE, ladder=LADDER, max_passes=OCR_MAX_PASSES, quality=None):
+    """OCR img with the cheapest ladder step that reaches target mean word confidence.
+
+    Returns {"text", "confidence", "tier", "psm", "lines", "attempts", "timings"}; when no step
+    reaches the target within max_passes the most confident attempt is returned. lines hold every
+    word of that attempt, text only its words above OCR_WORD_MIN_CONF. timings are seconds per stage,
+    including each preprocess step as preprocess_<step>.
+
+    quality is (blur, brightness) from suggestion.analyze_quality: the ladder then starts at the
+    tier preprocess.choose_tier picks for it instead of always trying the cheap pass first.
+    """
+    best = None
+    attempts = []
+    timings = {"enhance_image": 0.0, "tesseract": 0.0}
+    prepared = {}
+    empty = 0
+    first = TIER_ORDER.index(choose_tier(*quality)) if quality is not None else 0
+    for step in ladder:
+        if len(attempts) >= max_passes:
+            break
+        if TIER_ORDER.index(step["tier"]) < first:
+            continue
+        if best is not None and best[0] < step.get("min_prior", 0.0):
+            continue
+        started = time.perf_counter()
+        key = (step["tier"], step["max_pixels"])
+        if key not in prepared:
+            prepared[key], report = preprocess(img, tier=step["tier"], max_pixels=step["max_pixels"])
+            for stage, seconds in report_timings(report).items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+        image = prepared[key]
+        timings["enhance_image"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        words = read(image, step["psm"])
+        elapsed = time.perf_counter() - started
+        timings["tesseract"] += elapsed
+
+        conf = _mean([w["confidence"] for w in words])
+        attempts.append({"tier": step["name"], "confidence": conf, "words": len(words),
+                         "ms": round(elapsed * 1000, 2)})
+        if best is None or conf > best[0]:
+            best = (conf, step, words, img.shape[1] / float(image.shape[1]))
+        empty = 0 if words else empty + 1
+        # two passes without a single word: the frame almost certainly has no text
+        if conf >= target or empty >= 2:
+            break
+
+    conf, step, words, scale = best
+    lines = build_lines(words, scale)
+    return {
+        "text": confident_text(lines),
+        "confidence": conf,
+        "tier": step["name"],
+        "psm": step["psm"],
+        "lines": lines,
+        "attempts": attempts,
+        "timings": timings,
+    }
+
+
+def record(result):
+    """Feed an adaptive_ocr result (possibly from another process) into the stage metrics."""
+    for stage, seconds in result["timings"].items():
+        metrics.observe(stage, seconds)
+    metrics.count("ocr_tier", result["tier"])
@@ -0,0 +1,171 @@
+import os
+import re
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "512"))
+
+STOP_WORDS = {
+    "the", "a", "an", "and", "or", "but", "if", "then", "else", "for", "to", "of",
+    "in", "on", "at", "with", "as", "by", "from", "up", "down", "out", "over", "under",
+    "is", "are", "was", "were", "be", "been", "being", "it", "this", "that", "these", "those",
+    "we", "you", "he", "she", "they", "them", "his", "her", "their", "our", "your", "i",
+    "me", "my", "mine", "ours", "yours", "so", "not", "no", "yes", "do", "does", "did",
+    "can", "could", "would", "should", "will", "just", "than", "too", "very", "into", "about"
+}
+
+# one scan yields both word tokens and sentence boundaries
+TOKEN = re.compile(r"(?P<word>\w+(?:['-]\w+)*)|(?P<boundary>(?<=[.!?])\s+)")
+# keywords keep the original extract_keywords tokenisation ("10-year-old" -> "year-old"), which
+# word tokens cannot reproduce: a keyword starts at the first ASCII letter after a word boundary
+KEYWORD = re.compile(r"\b[a-zA-Z][a-zA-Z0-9'-]*\b")
+SEPARATOR = re.compile(r"['-]")
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word):
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return 0
+    vowels = "aeiouy"
+    count = 0
+    prev = False
+    for ch in word:
+        is_vowel = ch in vowels
+        if is_vowel and not prev:
+            count += 1
+        prev = is_vowel
+    if word.endswith("e") and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def _analyze(text):
+    words = []
+    starts = [0]
+    ends = []
+    for m in TOKEN.finditer(text):
+        if m.lastgroup == "word":
+            words.append(m.group())
+        else:
+            ends.append(m.start())
+            starts.append(m.end())
+    ends.append(len(text))
+    sentences = [s for s in (text[a:b].strip() for a, b in zip(starts, ends)) if s]
+
+    word_count = 0
+    syllable_count = 0
+    for w in words:
+        lower = w.lower()
+        # "state-of-the-art" counts as four words, as \b\w+\b did
+        parts = SEPARATOR.split(lower) if ("-" in lower or "'" in lower) else (lower,)
+        word_count += len(parts)
+        syllable_count += sum(count_syllables(part) for part in parts)
+
+    tokens = (t.lower() for t in KEYWORD.findall(text))
+    counts = Counter(t for t in tokens if len(t) > 2 and t not in STOP_WORDS)
+
+    return {
+        "word_count": word_count,
+        "character_count": len(text),
+        "sentence_count": max(len(sentences), 1),
+        "syllable_count": syllable_count or 1,
+        "sentences": sentences,
+        "keywords": [w for w, _ in counts.most_common()],
+    }
+
+
+def readability(word_count, sentence_count, syllable_count):
+    grade = 0.39 * (word_count / sentence_count) + 11.8 * (syllable_count / max(word_count, 1)) - 15.59
+    return max(1, round(grade))
+
+
+class AnalyticsCache:
+    def __init__(self, max_size=ANALYTICS_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, text):
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        result = _analyze(text)
+        with self._lock:
+            self._items[key] = result
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._items), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+CACHE = AnalyticsCache()
+
+
+def analyze(text):
+    return CACHE.get_or_compute(text or "")
+
+
+def text_stats(text):
+    a = analyze(text)
+    return {
+        "word_count": a["word_count"],
+        "character_count": a["character_count"],
+        "sentence_count": a["sentence_count"],
+        "readability_grade": readability(a["word_count"], a["sentence_count"], a["syllable_count"]),
+    }
+
+
+def keywords(text, top_k=10):
+    return analyze(text)["keywords"][:top_k]
+
+
+def summary(text, max_sentences=3):
+    return " ".join(analyze(text)["sentences"][:max_sentences]).strip()
+
+
+def report(text, top_k=10, max_sentences=3):
+    return {
+        "stats": text_stats(text),
+        "keywords": keywords(text, top_k),
+        "summary": summary(text, max_sentences),
+    }
+
+
+def report_many(texts, top_k=10, max_sentences=3):
+    """Analyze a batch of documents; duplicates are computed once and readability is vectorized."""
+    import numpy as np
+
+    results = [analyze(t) for t in texts]
+    if not results:
+        return []
+    words = np.array([r["word_count"] for r in results], dtype=float)
+    sents = np.array([r["sentence_count"] for r in results], dtype=float)
+    sylls = np.array([r["syllable_count"] for r in results], dtype=float)
+    grades = 0.39 * (words / sents) + 11.8 * (sylls / np.maximum(words, 1)) - 15.59
+    grades = np.maximum(1, np.round(grades)).astype(int)
+
+    out = []
+    for r, grade in zip(results, grades):
+        out.append({
+            "stats": {
+                "word_count": r["word_count"],
+                "character_count": r["character_count"],
+                "sentence_count": r["sentence_count"],
+                "readability_grade": int(grade),
+            },
+            "keywords": r["keywords"][:top_k],
+            "summary": " ".join(r["sentences"][:max_sentences]).strip(),
+        })
+    return out
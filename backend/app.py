@@ -1,15 +1,36 @@
-from flask import Flask, Response, request, jsonify, send_from_directory
-from text import extract_text_from_image
+from flask import Flask, Response, g, request, jsonify, send_from_directory
+from text import extract_structured, extract_text_from_array
+import metrics
 import time
 import numpy
 import base64
 import os
-import re
+import threading
+import json
+import uuid
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 import cv2 as cv
 import numpy
-from deep_translator import GoogleTranslator
-from download import build_export
+from translation import UnsupportedLanguage, get_translator
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+from download import EXPORTERS, EXPORT_CACHE, build_cached, stream_batch_zip, stream_cached
+from ocr_pool import PoolBusy, get_pool, peek_pool
+from ocr_cache import OCRCache
+from jobs import JobManager
+from camera import BROADCASTER, generate_frames
+from regions import extract_text_by_regions
+import analytics
+from session_store import create_store
+from bulk import clamp_workers, run_bulk
+from storage import file_name, get_store
+from best_shot import BestShotBuffer
+from pages import MAX_PAGES, count_pages, iter_pages, ocr_pages
 
 try:
     from suggestion import analyze_quality, get_image
@@ -26,109 +47,180 @@ except Exception:
             tips.append("Low light detected.")
         if bright >= 220:
             tips.append("Too bright, reduce glare.")
-        return ok, tips, blur
+        return ok, tips, blur, float(bright)
 
     def get_image(frame):
         gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
         gray = cv.resize(gray, None, fx=2, fy=2, interpolation=cv.INTER_CUBIC)
         return cv.adaptiveThreshold(gray, 255, cv.ADAPTIVE_THRESH_GAUSSIAN_C, cv.THRESH_BINARY, 11, 2)
 
-from text import extract_text_from_image
+analyze_quality = metrics.timed("analyze_quality")(analyze_quality)
 
 FRONTEND = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend"))
+BULK_ROOT = os.path.abspath(os.getenv("BULK_ROOT", os.path.join(os.path.dirname(__file__), "images")))
+BULK_OUTPUT_DIR = os.path.abspath(os.getenv("BULK_OUTPUT_DIR", os.path.join(os.path.dirname(__file__), "bulk")))
+SAVE_CAPTURES = os.getenv("SAVE_CAPTURES", "1") != "0"
+USE_OCR_POOL = os.getenv("OCR_POOL", "1") != "0"
+OCR_REGIONS = os.getenv("OCR_REGIONS", "0") == "1"
+BEST_SHOT = os.getenv("BEST_SHOT", "1") != "0"
 app = Flask(__name__, template_folder=FRONTEND, static_folder=FRONTEND)
-STORE = {}
+STORE = create_store()
+OCR_CACHE = OCRCache()
+JOBS = JobManager()
+BEST_SHOTS = BestShotBuffer()
+BULK_RUNS = {}
+# OCRFailed from the pool; pytesseract's TesseractError / TesseractNotFoundError when OCR runs inline
+OCR_ERRORS = (RuntimeError, OSError)
+RESULTS_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("RESULTS_WORKERS", "8")), thread_name_prefix="results")
+STEP_TIMEOUTS = {
+    "translation": float(os.getenv("TRANSLATE_TIMEOUT", "15")),
+    "ai_summary": float(os.getenv("AI_SUMMARY_TIMEOUT", "30")),
+}
+
+
+def cache_gauges():
+    caches = {
+        "ocr": OCR_CACHE.stats(),
+        "translation": get_translator().cache.stats(),
+        "export": EXPORT_CACHE.stats(),
+        "analytics": analytics.CACHE.stats(),
+        "session": STORE.stats(),
+    }
+    ratios = {}
+    for name, stats in caches.items():
+        total = stats["hits"] + stats["misses"]
+        ratios[name] = round(stats["hits"] / total, 4) if total else 0.0
+    gauges = [("cache_hit_ratio", "Hit ratio of each cache.", ratios)]
+    # a scrape must not boot the worker processes; report the pool once a request has started it
+    if USE_OCR_POOL and peek_pool() is not None:
+        pool = peek_pool().stats()
+        gauges += [
+            ("ocr_pool_queue_depth", "Images waiting for an OCR worker.", pool["queue_depth"]),
+            ("ocr_pool_utilization", "Share of OCR worker time spent busy.", pool["utilization"]),
+        ]
+    return gauges
+
+
+metrics.register_collector(cache_gauges)
+
+
+@app.before_request
+def start_stage_trace():
+    if request.headers.get("X-Trace") == "1":
+        g.trace_token = metrics.start_trace()
+
+
+@app.after_request
+def add_stage_trace(response):
+    token = g.pop("trace_token", None)
+    if token is not None:
+        response.headers["Server-Timing"] = metrics.server_timing(metrics.end_trace(token))
+    return response
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 def serve(name):
     return send_from_directory(FRONTEND, name)
 
 
+def decode_bytes(buf):
+    if not buf:
+        return None
+    try:
+        with metrics.stage("imdecode"):
+            return cv.imdecode(numpy.frombuffer(buf, numpy.uint8), cv.IMREAD_COLOR)
+    except Exception:
+        return None
+
+
 def decode_image(data_url):
     if not data_url:
         return None
     if "," in data_url:
         data_url = data_url.split(",", 1)[1]
     try:
-        buf = base64.b64decode(data_url)
-        return cv.imdecode(numpy.frombuffer(buf, numpy.uint8), cv.IMREAD_COLOR)
+        with metrics.stage("base64_decode"):
+            buf = base64.b64decode(data_url)
+        return decode_bytes(buf)
     except Exception:
         return None
 
 
-def summarize(text, max_sentences=3):
-    parts = re.split(r"(?<=[.!?])\s+", text.strip())
-    return " ".join([s for s in parts if s][:max_sentences]).strip()
+def read_frame():
+    """Decode a frame from a raw image body, a multipart "file" field or the legacy JSON data URL."""
+    if request.mimetype.startswith("image/") or request.mimetype == "application/octet-stream":
+        user_id = request.args.get("user_id", "default_user")
+        return decode_bytes(request.get_data(cache=False)), user_id
+    file = request.files.get("file")
+    if file is not None:
+        user_id = request.form.get("user_id", request.args.get("user_id", "default_user"))
+        return decode_bytes(file.read()), user_id
+    payload = request.get_json(silent=True) or {}
+    return decode_image(payload.get("image")), payload.get("user_id", "default_user")
 
 
-def analyze_text_stats(text):
-    words = re.findall(r"\b\w+\b", text)
-    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
-    sentence_count = max(len([s for s in sentences if s.strip()]), 1)
-    word_count = len(words)
-    character_count = len(text)
-    syllables = 0
-    for w in words:
-        w = re.sub(r"[^a-z]", "", w.lower())
-        if not w:
-            continue
-        vowels = "aeiouy"
-        count = 0
-        prev = False
-        for ch in w:
-            is_vowel = ch in vowels
-            if is_vowel and not prev:
-                count += 1
-            prev = is_vowel
-        if w.endswith("e") and count > 1:
-            count -= 1
-        syllables += max(count, 1)
-    syllables = syllables or 1
-    readability = 0.39 * (word_count / sentence_count) + 11.8 * (syllables / max(word_count, 1)) - 15.59
-    return {
-        "word_count": word_count,
-        "character_count": character_count,
-        "sentence_count": sentence_count,
-        "readability_grade": max(1, round(readability))
-    }
+def scan_session(user_id):
+    """Best-shot buffer key: the per-tab session_id sent by scan.html, else the user id (older clients)."""
+    session_id = request.args.get("session_id") or request.form.get("session_id")
+    if session_id is None and request.is_json:
+        session_id = (request.get_json(silent=True) or {}).get("session_id")
+    return session_id or user_id
 
 
-def extract_keywords(text, top_k=10):
-    stop = {
-        "the", "a", "an", "and", "or", "but", "if", "then", "else", "for", "to", "of",
-        "in", "on", "at", "with", "as", "by", "from", "up", "down", "out", "over", "under",
-        "is", "are", "was", "were", "be", "been", "being", "it", "this", "that", "these", "those",
-        "we", "you", "he", "she", "they", "them", "his", "her", "their", "our", "your", "i",
-        "me", "my", "mine", "ours", "yours", "so", "not", "no", "yes", "do", "does", "did",
-        "can", "could", "would", "should", "will", "just", "than", "too", "very", "into", "about"
-    }
-    tokens = [t.lower() for t in re.findall(r"\b[a-zA-Z][a-zA-Z0-9'-]*\b", text)]
-    tokens = [t for t in tokens if t not in stop and len(t) > 2]
-    counts = {}
-    for t in tokens:
-        counts[t] = counts.get(t, 0) + 1
-    return [k for k, _ in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:top_k]]
+def save_capture(frame, prefix):
+    ok, buf = cv.imencode(".jpg", frame)
+    if not ok:
+        return None
+    data = buf.tobytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if not SAVE_CAPTURES:
+        return file_name(digest)
+
+    def write():
+        try:
+            store = get_store()
+            store.put(data, "processed", {"kind": prefix, "captured": time.time()}, digest=digest)
+            store.start_sweeper()
+        except Exception as e:
+            metrics.error("save_capture")
+            print(f"Save error: {e}")
+
+    threading.Thread(target=write, daemon=True).start()
+    return file_name(digest)
+
+
+def run_ocr(frame, user_id=None, quality=None):
+    """quality is the frame's (blur, brightness) when analyze_quality already measured it."""
+    cached = OCR_CACHE.get_frame(frame, user_id)
+    if cached is not None:
+        return cached
+    with metrics.stage("ocr"):
+        if OCR_REGIONS:
+            result = extract_text_by_regions(frame, ocr=get_pool().ocr if USE_OCR_POOL else None)
+        elif USE_OCR_POOL:
+            result = get_pool().ocr(frame, quality=quality)
+        else:
+            result = extract_text_from_array(frame, quality=quality)
+    OCR_CACHE.put_frame(frame, result, user_id)
+    return result
 
 
+def summarize(text, max_sentences=3):
+    return analytics.summary(text, max_sentences)
 
 
-def generate_frames():
-    idx = 0
-    while True:
-        cam = cv.VideoCapture(idx)
-        if not cam.isOpened():
-            idx += 1
-            continue
-        break
+def analyze_text_stats(text):
+    return analytics.text_stats(text)
+
+
+def extract_keywords(text, top_k=10):
+    return analytics.keywords(text, top_k)
 
-    while True:
-        ok, frame = cam.read()
-        if not ok:
-            continue
-        _, buf = cv.imencode(".jpg", frame)
-        yield b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + buf.tobytes() + b"\r\n"
 
-    cam.release()
 
 
 @app.route("/")
@@ -157,32 +249,123 @@ def video_feed():
     return Response(generate_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
 
-@app.route("/analyze_and_capture", methods=["POST"])
-def analyze_and_capture():
-    payload = request.get_json(silent=True) or {}
-    frame = decode_image(payload.get("image"))
-    user_id = payload.get("user_id", "default_user")
+def ocr_capture(frame, user_id, quality=None):
+    try:
+        text, conf = run_ocr(frame, user_id, quality)
+    except PoolBusy:
+        return {"status": "analyzing", "suggestions": ["Server is busy, retrying..."]}, 503
+    except OCR_ERRORS as e:
+        return {"status": "error", "message": f"OCR failed: {e}"}, 500
+    if not text:
+        return {"status": "analyzing", "suggestions": [
+            "No readable text detected. Try better lighting, move closer, or stabilize the camera."
+        ]}, 200
+
+    filename = save_capture(frame, "capture")
+    STORE.set(user_id, text)
+    return {"status": "success", "text": text, "filename": filename}, 200
+
+
+def ocr_upload(data, user_id):
+    cached = OCR_CACHE.get_bytes(data)
+    if cached is not None:
+        STORE.set(user_id, cached[0])
+        return {"status": "success", "text": cached[0]}, 200
+
+    frame = decode_bytes(data)
     if frame is None:
-        return jsonify({"status": "error", "message": "Invalid image data."}), 400
+        return {"status": "error"}, 400
 
-    ok, tips, _ = analyze_quality(frame)
-    if not ok:
-        return jsonify({"status": "analyzing", "suggestions": tips})
+    try:
+        text, conf = run_ocr(frame, user_id)
+    except PoolBusy:
+        return {"status": "error", "message": "OCR queue is full, try again."}, 503
+    except OCR_ERRORS as e:
+        return {"status": "error", "message": f"OCR failed: {e}"}, 500
+    OCR_CACHE.put_bytes(data, (text, conf))
+    if text:
+        save_capture(frame, "upload")
+    STORE.set(user_id, text)
+    return {"status": "success", "text": text}, 200
+
+
+def pick_frame(frame, session_id):
+    """Quality-gate a live frame; returns (frame_to_ocr, (blur, brightness), None) or (None, None, "analyzing" body)."""
+    ok, tips, blur, brightness = analyze_quality(frame)
+    if not BEST_SHOT:
+        return (frame, (blur, brightness), None) if ok else (None, None, {"status": "analyzing", "suggestions": tips})
+    best, quality, outcome = BEST_SHOTS.offer(session_id, frame, blur, ok, tips, brightness=brightness)
+    if best is not None:
+        return best, quality, None
+    if outcome == "unstable" and not tips:
+        tips = ["Hold the camera steady. The image is moving."]
+    elif not tips:
+        tips = BEST_SHOTS.suggestions(session_id) or ["Hold steady while the sharpest frame is picked."]
+    return None, None, {"status": "analyzing", "suggestions": tips}
+
+
+def analyze_frame(frame, user_id, session_id=None):
+    if frame is None:
+        return {"status": "error", "message": "Invalid image data."}, 400
 
-    images_dir = os.path.join(os.path.dirname(__file__), "images", "saved")
-    os.makedirs(images_dir, exist_ok=True)
-    filename = f"capture_{int(time.time())}.jpg"
-    cv.imwrite(os.path.join(images_dir, filename), frame)
+    frame, quality, body = pick_frame(frame, session_id or user_id)
+    if frame is None:
+        return body, 200
 
-    image_path = f"images/saved/{filename}"
-    text = extract_text_from_image(image_path=image_path)
-    if not text:
-        return jsonify({"status": "analyzing", "suggestions": [
-            "No readable text detected. Try better lighting, move closer, or stabilize the camera."
-        ]})
+    return ocr_capture(frame, user_id, quality)
+
+
+@app.route("/api/best_shot_stats", methods=["GET"])
+def best_shot_stats():
+    return jsonify(BEST_SHOTS.stats())
+
+
+@app.route("/api/camera_stats", methods=["GET"])
+def camera_stats():
+    return jsonify(BROADCASTER.stats())
 
-    STORE[user_id] = text
-    return jsonify({"status": "success", "text": text, "filename": filename})
+
+@app.route("/analyze_and_capture", methods=["POST"])
+def analyze_and_capture():
+    payload = request.get_json(silent=True) or {}
+    frame = decode_image(payload.get("image"))
+    user_id = payload.get("user_id", "default_user")
+    body, code = analyze_frame(frame, user_id, scan_session(user_id))
+    return jsonify(body), code
+
+
+@app.route("/api/frames", methods=["POST"])
+def analyze_binary_frame():
+    frame, user_id = read_frame()
+    body, code = analyze_frame(frame, user_id, scan_session(user_id))
+    return jsonify(body), code
+
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route("/ws/frames")
+    def frames_socket(ws):
+        user_id = request.args.get("user_id", "default_user")
+        session_id = request.args.get("session_id")
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, str):
+                try:
+                    control = json.loads(message)
+                except ValueError:
+                    control = None
+                if not isinstance(control, dict):
+                    ws.send(json.dumps({"status": "error", "message": "Control messages must be a JSON object."}))
+                    continue
+                user_id = control.get("user_id", user_id)
+                continue
+            body, _ = analyze_frame(decode_bytes(message), user_id, session_id)
+            ws.send(json.dumps(body))
+            if body["status"] == "success":
+                break
 
 
 @app.route("/check_quality", methods=["POST"])
@@ -191,8 +374,8 @@ def check_quality():
     frame = decode_image(payload.get("image"))
     if frame is None:
         return jsonify({"status": "error", "message": "Invalid image data."}), 400
-    ok, tips, _ = analyze_quality(frame)
-    return jsonify({"status": "ok", "is_good": ok, "suggestions": tips})
+    ok, tips, _, _ = analyze_quality(frame)
+    return jsonify({"status": "ok", "is_good": bool(ok), "suggestions": tips})
 
 
 @app.route("/upload_image", methods=["POST"])
@@ -206,34 +389,209 @@ def upload_image():
 
     try:
         data = file.read()
-        frame = cv.imdecode(numpy.frombuffer(data, numpy.uint8), cv.IMREAD_COLOR)
-        if frame is None:
-            return jsonify({"status": "error"}), 400
-
         user_id = request.form.get("user_id", "default_user")
-        images_dir = os.path.join(os.path.dirname(__file__), "images", "saved")
-        os.makedirs(images_dir, exist_ok=True)
-        
-        filename = f"upload_{int(time.time())}.jpg"
-        filepath = os.path.join(images_dir, filename)
-        cv.imwrite(filepath, frame)
-
-        text, conf = extract_text_from_image(filepath)
-        STORE[user_id] = text
-        
-        return jsonify({"status": "success", "text": text})
+        body, code = ocr_upload(data, user_id)
+        return jsonify(body), code
     except Exception as e:
+        metrics.error("upload")
         print(f"Upload error: {e}")
         return jsonify({"status": "error"}), 500
 
 
+@app.route("/api/upload_document", methods=["POST"])
+def upload_document():
+    """OCR a multi-page TIFF or a ZIP of page images, streaming one NDJSON line per page in page order."""
+    file = request.files.get("file")
+    if file is None or file.filename == "":
+        return jsonify({"status": "error", "message": "No file uploaded."}), 400
+    user_id = request.form.get("user_id", "default_user")
+
+    # spool the upload to disk so only the pages in flight are ever decoded in memory
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(file.filename)[1])
+    with os.fdopen(fd, "wb") as f:
+        file.save(f)
+
+    try:
+        page_count = count_pages(path)
+    except Exception:
+        page_count = None
+    if page_count is None or page_count > MAX_PAGES:
+        os.remove(path)
+        message = "Could not read the document." if page_count is None else \
+            f"Document has {page_count} pages; the limit is {MAX_PAGES}."
+        return jsonify({"status": "error", "message": message}), 400
+
+    def stream():
+        texts = []
+        pages = 0
+        submit = get_pool().submit if USE_OCR_POOL else None
+        for item in ocr_pages(iter_pages(path), submit):
+            pages += 1
+            if item.get("text"):
+                texts.append(item["text"])
+            yield json.dumps(item) + "\n"
+        text = "\n\n".join(texts)
+        STORE.set(user_id, text)
+        yield json.dumps({"status": "done", "pages": pages, "text": text}) + "\n"
+
+    response = Response(stream(), mimetype="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+    # runs even when the client disconnects before the generator starts
+    response.call_on_close(lambda: os.path.exists(path) and os.remove(path))
+    return response
+
+
+@app.route("/api/ocr_structured", methods=["POST"])
+def ocr_structured():
+    """Lines, word boxes and confidences for one image, and the OCR tier it needed."""
+    frame, _ = read_frame()
+    if frame is None:
+        return jsonify({"status": "error", "message": "Invalid image data."}), 400
+    try:
+        with metrics.stage("ocr"):
+            result = get_pool().ocr_structured(frame) if USE_OCR_POOL else extract_structured(frame)
+    except PoolBusy:
+        return jsonify({"status": "error", "message": "OCR queue is full, try again."}), 503
+    except OCR_ERRORS as e:
+        return jsonify({"status": "error", "message": f"OCR failed: {e}"}), 500
+    result.pop("timings", None)
+    return jsonify({"status": "success", **result})
+
+
+@app.route("/api/scan_jobs", methods=["POST"])
+def create_scan_job():
+    file = request.files.get("file")
+    if file is not None and request.form.get("mode") != "frame":
+        if file.filename == "":
+            return jsonify({"status": "error", "message": "Invalid file."}), 400
+        user_id = request.form.get("user_id", "default_user")
+        # jobs are queued per tab (scan session); user_id only picks the STORE entry for the text
+        job = JOBS.submit(scan_session(user_id), lambda data, uid: ocr_upload(data, uid)[0], file.read(), user_id)
+        return jsonify(job.to_dict()), 202
+
+    frame, user_id = read_frame()
+    if frame is None:
+        return jsonify({"status": "error", "message": "Invalid image data."}), 400
+
+    session = scan_session(user_id)
+    frame, quality, body = pick_frame(frame, session)
+    if frame is None:
+        return jsonify(body)
+
+    job = JOBS.submit(session, lambda f, uid: ocr_capture(f, uid, quality)[0], frame, user_id)
+    return jsonify(job.to_dict()), 202
+
+
+@app.route("/api/scan_jobs/<job_id>", methods=["GET"])
+def get_scan_job(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job."}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/scan_jobs/<job_id>/events", methods=["GET"])
+def scan_job_events(job_id):
+    if JOBS.get(job_id) is None:
+        return jsonify({"status": "error", "message": "Unknown job."}), 404
+
+    def stream():
+        last = None
+        while True:
+            state = JOBS.wait(job_id, last)
+            if state is None:
+                break
+            if state["status"] == last:
+                yield ": keepalive\n\n"
+                continue
+            last = state["status"]
+            yield f"data: {json.dumps(state)}\n\n"
+            if last in ("done", "error"):
+                break
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.route("/api/bulk_ingest", methods=["POST"])
+def api_bulk_ingest():
+    """Start a bulk OCR run over a directory under BULK_ROOT or an uploaded .zip/.tar archive."""
+    os.makedirs(BULK_OUTPUT_DIR, exist_ok=True)
+    file = request.files.get("file")
+    payload = request.get_json(silent=True) or {}
+    uploaded = file is not None and bool(file.filename)
+    if uploaded:
+        run_id = uuid.uuid4().hex
+        source = os.path.join(BULK_OUTPUT_DIR, f"{run_id}_{os.path.basename(file.filename)}")
+        file.save(source)
+    else:
+        source = os.path.abspath(os.path.join(BULK_ROOT, payload.get("source") or ""))
+        if os.path.commonpath([source, BULK_ROOT]) != BULK_ROOT or not os.path.exists(source):
+            return jsonify({"status": "error", "message": "Unknown source."}), 400
+        # the same source resumes from its checkpoint file
+        run_id = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+    run = BULK_RUNS.get(run_id)
+    if run is not None and not run.get("finished"):
+        return jsonify({"status": "running", "run_id": run_id, "progress": run}), 202
+
+    output = os.path.join(BULK_OUTPUT_DIR, f"{run_id}.jsonl")
+    BULK_RUNS[run_id] = {"source": source, "output": output, "processed": 0, "finished": False}
+
+    def update(progress):
+        BULK_RUNS[run_id] = progress
+
+    workers = clamp_workers(payload.get("workers") or request.form.get("workers"))
+
+    def work():
+        try:
+            run_bulk(source, output, workers=workers, progress=update)
+        except Exception as e:
+            BULK_RUNS[run_id] = dict(BULK_RUNS[run_id], finished=True, error=str(e))
+        finally:
+            # an uploaded archive gets a fresh run_id, so it can never be resumed
+            if uploaded and os.path.exists(source):
+                os.remove(source)
+
+    threading.Thread(target=work, name=f"bulk-{run_id}", daemon=True).start()
+    return jsonify({"status": "running", "run_id": run_id}), 202
+
+
+@app.route("/api/bulk_ingest/<run_id>", methods=["GET"])
+def bulk_ingest_status(run_id):
+    run = BULK_RUNS.get(run_id)
+    if run is None:
+        return jsonify({"status": "error", "message": "Unknown run."}), 404
+    return jsonify({"status": "done" if run.get("finished") else "running", "run_id": run_id, "progress": run})
+
+
+@app.route("/api/storage_stats", methods=["GET"])
+def storage_stats():
+    return jsonify(get_store().stats())
+
+
+@app.route("/api/ocr_stats", methods=["GET"])
+def ocr_stats():
+    if not USE_OCR_POOL:
+        return jsonify({"status": "disabled"})
+    return jsonify(get_pool().stats())
+
+
+@app.route("/api/ocr_cache_stats", methods=["GET"])
+def ocr_cache_stats():
+    return jsonify(OCR_CACHE.stats())
+
+
 @app.route("/api/get_extracted_text", methods=["GET"])
 def get_extracted_text():
     user_id = request.args.get("user_id", "default_user")
-    text = STORE.get(user_id, "") or extract_text_from_image()
+    text = STORE.get(user_id, "")
     return jsonify({"status": "success", "text": text})
 
 
+@app.route("/api/session_stats", methods=["GET"])
+def session_stats():
+    return jsonify(STORE.stats())
+
+
 @app.route("/api/summarize", methods=["POST"])
 def api_summarize():
     text = (request.get_json(silent=True) or {}).get("text", "").strip()
@@ -249,10 +607,20 @@ def api_translate():
     target = (payload.get("target_language") or "en").strip()
     if not text:
         return jsonify({"status": "error", "message": "No text provided."}), 400
-    translated = GoogleTranslator(source="auto", target=target).translate(text)
+    try:
+        translated = get_translator().translate(text, target)
+    except UnsupportedLanguage as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e) or e.__class__.__name__}), 502
     return jsonify({"status": "success", "translated_text": translated})
 
 
+@app.route("/api/translation_stats", methods=["GET"])
+def translation_stats():
+    return jsonify(get_translator().cache.stats())
+
+
 @app.route("/api/analyze_text", methods=["POST"])
 def api_analyze_text():
     text = (request.get_json(silent=True) or {}).get("text", "").strip()
@@ -269,6 +637,100 @@ def api_get_keywords():
     return jsonify({"keywords": extract_keywords(text)})
 
 
+@app.route("/api/analyze_batch", methods=["POST"])
+def api_analyze_batch():
+    texts = (request.get_json(silent=True) or {}).get("texts")
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"status": "error", "message": "No texts provided."}), 400
+    return jsonify({"status": "success", "results": analytics.report_many([str(t or "") for t in texts])})
+
+
+def ai_summary(text):
+    from ai import summarize_text
+    return summarize_text(text)
+
+
+@app.route("/api/ai_summarize", methods=["POST"])
+def api_ai_summarize():
+    payload = request.get_json(silent=True) or {}
+    text = (payload.get("text") or "").strip()
+    if not text:
+        return jsonify({"status": "error", "message": "No text provided."}), 400
+
+    from ai import stream_summary
+    try:
+        if payload.get("stream"):
+            return Response(stream_summary(text), mimetype="text/plain; charset=utf-8",
+                            headers={"Cache-Control": "no-cache"})
+        return jsonify({"status": "success", "summary": ai_summary(text)})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 502
+
+
+@app.route("/api/results", methods=["POST"])
+def api_results():
+    """Run every analysis step for one document and stream each result as an NDJSON line.
+
+    The upstream calls (translation, AI summary) start first on RESULTS_EXECUTOR; the cheap local
+    steps run inline meanwhile, so a backlog of slow upstream calls never delays them.
+    """
+    payload = request.get_json(silent=True) or {}
+    text = (payload.get("text") or STORE.get(payload.get("user_id") or "default_user", "") or "").strip()
+    if not text:
+        return jsonify({"status": "error", "message": "No text provided."}), 400
+
+    local_steps = {
+        "stats": analyze_text_stats,
+        "keywords": extract_keywords,
+        "summary": summarize,
+    }
+    upstream_steps = {}
+    target = (payload.get("target_language") or "").strip()
+    if target:
+        upstream_steps["translation"] = (get_translator().translate, text, target)
+    if payload.get("ai_summary"):
+        upstream_steps["ai_summary"] = (ai_summary, text)
+
+    started = time.monotonic()
+    futures = {RESULTS_EXECUTOR.submit(fn, *args): name for name, (fn, *args) in upstream_steps.items()}
+
+    def line(name, status, data=None, message=None):
+        item = {"step": name, "status": status, "elapsed_ms": round((time.monotonic() - started) * 1000, 1)}
+        if data is not None:
+            item["data"] = data
+        if message:
+            item["message"] = message
+        return json.dumps(item) + "\n"
+
+    def stream():
+        for name, fn in local_steps.items():
+            try:
+                yield line(name, "success", fn(text))
+            except Exception as e:
+                yield line(name, "error", message=str(e) or e.__class__.__name__)
+
+        pending = set(futures)
+        while pending:
+            now = time.monotonic() - started
+            expired = [f for f in pending if now >= STEP_TIMEOUTS.get(futures[f], 10)]
+            for f in expired:
+                # a queued call is dropped; a running one finishes on its own client timeout
+                pending.discard(f)
+                f.cancel()
+                yield line(futures[f], "timeout")
+            if not pending:
+                break
+            next_deadline = min(STEP_TIMEOUTS.get(futures[f], 10) for f in pending) - now
+            done, pending = wait(pending, timeout=max(next_deadline, 0), return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    yield line(futures[f], "success", f.result())
+                except Exception as e:
+                    yield line(futures[f], "error", message=str(e) or e.__class__.__name__)
+
+    return Response(stream(), mimetype="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
 @app.route("/api/export_file", methods=["POST"])
 def api_export_file():
     payload = request.get_json(silent=True) or {}
@@ -277,7 +739,7 @@ def api_export_file():
     if not text:
         return jsonify({"status": "error", "message": "No text provided."}), 400
 
-    filename, mime, data = build_export(text, file_type)
+    filename, mime, data = build_cached(text, file_type)
     if not data:
         return jsonify({"status": "error", "message": "Unsupported file type."}), 400
 
@@ -289,7 +751,45 @@ def api_export_file():
     })
 
 
+@app.route("/api/export", methods=["POST"])
+def api_export():
+    payload = request.get_json(silent=True) or {}
+    text = (payload.get("text") or "").strip()
+    file_type = payload.get("file_type") or "pdf"
+    if not text:
+        return jsonify({"status": "error", "message": "No text provided."}), 400
+
+    try:
+        filename, mime, body = stream_cached(text, file_type)
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"Could not build {file_type}: {e}"}), 500
+    if body is None:
+        return jsonify({"status": "error", "message": "Unsupported file type."}), 400
+
+    return Response(body, mimetype=mime, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@app.route("/api/export_batch", methods=["POST"])
+def api_export_batch():
+    payload = request.get_json(silent=True) or {}
+    text = (payload.get("text") or "").strip()
+    file_types = payload.get("file_types") or []
+    if not text:
+        return jsonify({"status": "error", "message": "No text provided."}), 400
+    unsupported = [t for t in file_types if str(t).lower() not in EXPORTERS]
+    if not file_types or unsupported:
+        return jsonify({"status": "error", "message": "Unsupported file type.", "unsupported": unsupported}), 400
+
+    return Response(stream_batch_zip(text, file_types), mimetype="application/zip",
+                    headers={"Content-Disposition": 'attachment; filename="scan.zip"'})
+
+
+@app.route("/api/export_stats", methods=["GET"])
+def export_stats():
+    return jsonify(EXPORT_CACHE.stats())
+
+
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", debug=True, port=5000)
\ No newline at end of file
+    app.run(host="0.0.0.0", debug=True, port=int(os.getenv("PORT", "5000")))
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""Production serving mode: an ASGI app that runs the upstream-bound endpoints on an event loop.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+/api/ai_summarize (non-streaming) is awaited on the loop, so a slow OpenAI call no longer pins a
+server thread. /api/translate is also served on the loop, but Google translation is blocking, so its
+calls run on the translator's own pool and its limit defaults to that pool's size (TRANSLATE_WORKERS).
+Every other route is the Flask app, run through a small WSGI bridge; OCR itself still runs in the
+ocr_pool process pool. Each endpoint class has its own concurrency limit (LIMIT_<CLASS>); a request
+that cannot get a slot within LIMIT_WAIT seconds gets a 503 instead of queueing without bound.
+The bridge pool is sized to the sum of the bridged class limits, so an admitted request never waits
+for a thread; long-lived streams (SSE job events, streamed AI summaries) have a pool of their own.
+
+WebSocket routes (/ws/frames) are only served by the Flask dev server (app.py).
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from app import app as flask_app, get_translator
+from translation import TRANSLATE_WORKERS, UnsupportedLanguage
+
+LIMIT_WAIT = float(os.getenv("LIMIT_WAIT", "2"))
+SPOOL_BYTES = 1024 * 1024
+LIMITS = {
+    "upstream": int(os.getenv("LIMIT_UPSTREAM", "256")),
+    "translate": int(os.getenv("LIMIT_TRANSLATE", str(TRANSLATE_WORKERS))),
+    "results": int(os.getenv("LIMIT_RESULTS", "16")),
+    "ocr": int(os.getenv("LIMIT_OCR", "16")),
+    "export": int(os.getenv("LIMIT_EXPORT", "8")),
+    "events": int(os.getenv("LIMIT_EVENTS", "64")),
+    "default": int(os.getenv("LIMIT_DEFAULT", "64")),
+}
+CLASSES = {
+    "results": ("/api/results",),
+    "ocr": ("/analyze_and_capture", "/api/frames", "/check_quality", "/upload_image", "/api/scan_jobs",
+            "/api/ocr_structured", "/api/upload_document", "/api/bulk_ingest"),
+    "export": ("/api/export", "/api/export_file", "/api/export_batch"),
+}
+NATIVE_CLASSES = {
+    ("POST", "/api/translate"): "translate",
+    ("POST", "/api/ai_summarize"): "upstream",
+}
+BRIDGED = ("results", "ocr", "export", "default")
+WSGI_THREADS = sum(LIMITS[name] for name in BRIDGED)
+
+_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix="wsgi")
+_stream_executor = ThreadPoolExecutor(max_workers=LIMITS["events"], thread_name_prefix="wsgi-stream")
+_END = object()
+
+
+def endpoint_class(method, path):
+    if (method, path) in NATIVE_CLASSES:
+        return NATIVE_CLASSES[(method, path)]
+    if path.startswith("/api/scan_jobs/") and path.endswith("/events"):
+        return "events"
+    if method == "GET" and path.startswith("/api/scan_jobs/"):
+        return "default"
+    for name, prefixes in CLASSES.items():
+        if path in prefixes or path.startswith(tuple(p + "/" for p in prefixes)):
+            return name
+    return "default"
+
+
+class Limiter:
+    """Per-class asyncio semaphore with in-flight and rejection counters."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._sem = None
+
+    async def acquire(self, timeout=LIMIT_WAIT):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.limit)
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._sem.release()
+
+    def stats(self):
+        return {"limit": self.limit, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+LIMITERS = {name: Limiter(limit) for name, limit in LIMITS.items()}
+
+
+async def read_body(receive):
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body.write(message.get("body", b""))
+        if not message.get("more_body"):
+            body.seek(0)
+            return body
+
+
+async def busy(send):
+    await send_json(send, 503, {"status": "error", "message": "Server is busy, try again."},
+                    [(b"retry-after", b"1")])
+
+
+async def send_json(send, status, data, headers=()):
+    payload = json.dumps(data).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+                   + list(headers),
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+def wsgi_environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        # read_body already has the whole body, so Werkzeug may read it without a Content-Length (chunked uploads)
+        "wsgi.input_terminated": True,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope, body, receive, send, executor=_executor):
+    """Run the Flask app on a WSGI thread pool and forward its (possibly streamed) body."""
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        return lambda data: None
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    result = await loop.run_in_executor(executor, flask_app, wsgi_environ(scope, body), start_response)
+    try:
+        chunks = iter(result)
+        chunk = await loop.run_in_executor(executor, next, chunks, _END)
+        await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        while chunk is not _END and not disconnected.is_set():
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            chunk = await loop.run_in_executor(executor, next, chunks, _END)
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        watcher.cancel()
+        if hasattr(result, "close"):
+            await loop.run_in_executor(executor, result.close)
+
+
+def read_json(body):
+    try:
+        payload = json.loads(body.read() or b"{}")
+    except ValueError:
+        payload = {}
+    body.seek(0)
+    return payload if isinstance(payload, dict) else {}
+
+
+async def api_translate(payload, send):
+    text = (payload.get("text") or "").strip()
+    target = (payload.get("target_language") or "en").strip()
+    if not text:
+        return await send_json(send, 400, {"status": "error", "message": "No text provided."})
+    try:
+        translated = await get_translator().atranslate(text, target)
+    except UnsupportedLanguage as e:
+        return await send_json(send, 400, {"status": "error", "message": str(e)})
+    except Exception as e:
+        return await send_json(send, 502, {"status": "error", "message": str(e) or e.__class__.__name__})
+    await send_json(send, 200, {"status": "success", "translated_text": translated})
+
+
+async def api_ai_summarize(payload, send):
+    from ai import asummarize_text
+
+    text = (payload.get("text") or "").strip()
+    if not text:
+        return await send_json(send, 400, {"status": "error", "message": "No text provided."})
+    try:
+        summary = await asummarize_text(text)
+    except Exception as e:
+        return await send_json(send, 502, {"status": "error", "message": str(e)})
+    await send_json(send, 200, {"status": "success", "summary": summary})
+
+
+NATIVE = {
+    ("POST", "/api/translate"): api_translate,
+    ("POST", "/api/ai_summarize"): api_ai_summarize,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            _executor.shutdown(wait=False)
+            _stream_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return  # websockets: use the Flask dev server
+
+    method, path = scope["method"], scope["path"]
+    if path == "/api/serving_stats":
+        return await send_json(send, 200, {name: limiter.stats() for name, limiter in LIMITERS.items()})
+
+    name = endpoint_class(method, path)
+    limiter = LIMITERS[name]
+    if not await limiter.acquire():
+        return await busy(send)
+    started = time.perf_counter()
+    try:
+        body = await read_body(receive)
+        if body is None:
+            return
+        handler = NATIVE.get((method, path))
+        if handler is not None:
+            payload = read_json(body)
+            if not payload.get("stream"):
+                return await handler(payload, send)
+            # streamed AI summaries hold a bridge thread for the whole response, like SSE job events
+            limiter.release()
+            name, limiter = "events", LIMITERS["events"]
+            if not await limiter.acquire():
+                limiter = None
+                return await busy(send)
+        await call_flask(scope, body, receive, send, _stream_executor if name == "events" else _executor)
+    finally:
+        if limiter is not None:
+            limiter.release()
+        metrics.observe(f"request_{name}", time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi:app", host="0.0.0.0", port=int(os.getenv("PORT", "5000")),
+                workers=int(os.getenv("WEB_WORKERS", "1")))
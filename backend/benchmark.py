@@ -0,0 +1,201 @@
+"""Replay the bundled images corpus through every OCR stage and report latency and throughput.
+
+    python benchmark.py --workers 4 --output bench_results.json
+    python benchmark.py --compare bench_results.json
+"""
+import argparse
+import base64
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = [os.path.join(HERE, "images", "saved"), os.path.join(HERE, "images", "processed")]
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_corpus(dirs=CORPUS, limit=0):
+    paths = []
+    for d in dirs:
+        paths.extend(p for p in sorted(glob.glob(os.path.join(d, "*"))) if p.lower().endswith(EXTENSIONS))
+    return paths[:limit] if limit else paths
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except Exception:
+        return None
+
+
+def timed(samples, name, fn, *args):
+    stage = samples.setdefault(name, {"ms": [], "errors": 0, "last_error": None})
+    started = time.perf_counter()
+    try:
+        out = fn(*args)
+    except Exception as e:
+        stage["errors"] += 1
+        stage["last_error"] = repr(e)[:200]
+        return None
+    stage["ms"].append((time.perf_counter() - started) * 1000)
+    return out
+
+
+def run_stages(paths):
+    from app import decode_image
+    from suggestion import analyze_quality, get_image
+    from text import enhance_image, extract_text_with_confidence
+    import ocr_utils
+
+    samples = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            data_url = "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+        frame = timed(samples, "decode_image", decode_image, data_url)
+        if frame is None:
+            continue
+        timed(samples, "analyze_quality", analyze_quality, frame)
+        timed(samples, "enhance_image", enhance_image, frame)
+        processed = timed(samples, "get_image", get_image, frame)
+        result = timed(samples, "text.extract_text_with_confidence", extract_text_with_confidence, path)
+        if processed is not None:
+            timed(samples, "ocr_utils.ocr_with_confidence", ocr_utils.ocr_with_confidence, processed)
+        text = result[0] if result else ""
+        if text:
+            timed(samples, "analyze_text_stats", ocr_utils.analyze_text_stats, text)
+            timed(samples, "extract_keywords", ocr_utils.extract_keywords, text)
+
+    report = {}
+    for name, s in samples.items():
+        report[name] = {
+            "count": len(s["ms"]),
+            "errors": s["errors"],
+            "p50_ms": round(percentile(s["ms"], 50), 3) if s["ms"] else None,
+            "p95_ms": round(percentile(s["ms"], 95), 3) if s["ms"] else None,
+            "mean_ms": round(sum(s["ms"]) / len(s["ms"]), 3) if s["ms"] else None,
+        }
+        if s["last_error"]:
+            report[name]["last_error"] = s["last_error"]
+    return report
+
+
+def pipeline(path):
+    import cv2
+    from suggestion import analyze_quality
+    from text import extract_text_from_array
+
+    frame = cv2.imread(path)
+    if frame is None:
+        return False
+    analyze_quality(frame)
+    try:
+        extract_text_from_array(frame)
+    except Exception:
+        return False
+    return True
+
+
+def run_throughput(paths, max_workers):
+    results = {}
+    for n in range(1, max_workers + 1):
+        with ProcessPoolExecutor(max_workers=n) as ex:
+            list(ex.map(pipeline, paths[:n]))  # warm up the worker processes
+            started = time.perf_counter()
+            ok = sum(ex.map(pipeline, paths))
+            elapsed = time.perf_counter() - started
+        results[str(n)] = {
+            "images_per_sec": round(len(paths) / elapsed, 3) if elapsed else None,
+            "elapsed_s": round(elapsed, 3),
+            "ok": ok,
+        }
+    return results
+
+
+def compare(old, new):
+    print(f"{'stage':40} {'p50 old':>10} {'p50 new':>10} {'p95 old':>10} {'p95 new':>10} {'p95 change':>11}")
+    for name, stats in new["stages"].items():
+        before = old.get("stages", {}).get(name, {})
+        change = ""
+        if before.get("p95_ms") and stats.get("p95_ms"):
+            change = f"{(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:40} {str(before.get('p50_ms')):>10} {str(stats.get('p50_ms')):>10} "
+              f"{str(before.get('p95_ms')):>10} {str(stats.get('p95_ms')):>10} {change:>11}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=0, help="only use the first N images")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    parser.add_argument("--skip-throughput", action="store_true")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    paths = load_corpus(limit=args.limit)
+    if not paths:
+        print("No images found in", ", ".join(CORPUS))
+        return 1
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "images": len(paths),
+        "stages": run_stages(paths),
+    }
+    if not args.skip_throughput:
+        results["throughput"] = run_throughput(paths, args.workers)
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, stats in results["stages"].items():
+        print(f"{name:40} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms errors={stats['errors']}")
+    for n, stats in results.get("throughput", {}).items():
+        print(f"workers={n:>2} {stats['images_per_sec']} images/s")
+    print(f"peak RSS: {results['peak_rss_mb']} MB -> {args.output}")
+
+    if previous is not None:
+        compare(previous, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+
+import cv2
+import numpy as np
+
+BEST_SHOT_WINDOW = float(os.getenv("BEST_SHOT_WINDOW", "1.0"))
+BEST_SHOT_FRAMES = int(os.getenv("BEST_SHOT_FRAMES", "6"))
+BEST_SHOT_MOTION = float(os.getenv("BEST_SHOT_MOTION", "8.0"))
+BEST_SHOT_SESSIONS = int(os.getenv("BEST_SHOT_SESSIONS", "64"))
+BEST_SHOT_IDLE = float(os.getenv("BEST_SHOT_IDLE", "30"))
+THUMB_SIZE = (80, 60)
+
+
+def thumbnail(frame):
+    small = cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    return small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def motion(a, b):
+    """Mean absolute difference of two thumbnails (0-255); None when there is no previous frame."""
+    if a is None or b is None:
+        return None
+    return float(np.mean(cv2.absdiff(a, b)))
+
+
+class _Session:
+    def __init__(self, size):
+        self.frames = deque(maxlen=size)
+        self.last = None
+        self.seen = 0.0
+        self.tips = []
+
+
+class BestShotBuffer:
+    """Per-session ring buffer of live frames; only the sharpest stable frame of each window goes to OCR.
+
+    offer() returns (frame, quality, outcome): outcome is "collecting" while the window is open (frame is None),
+    "selected" with the chosen frame and its (blur, brightness), or "unstable" when every frame in the
+    window was moving.
+    """
+
+    def __init__(self, window=BEST_SHOT_WINDOW, size=BEST_SHOT_FRAMES, max_motion=BEST_SHOT_MOTION,
+                 max_sessions=BEST_SHOT_SESSIONS, idle=BEST_SHOT_IDLE):
+        self.window = window
+        self.size = size
+        self.max_motion = max_motion
+        self.max_sessions = max_sessions
+        self.idle = idle
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.offered = 0
+        self.selected = 0
+        self.unstable = 0
+
+    def _session(self, session_id, now):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session(self.size)
+        self._sessions.move_to_end(session_id)
+        session.seen = now
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        for sid in [sid for sid, s in self._sessions.items() if now - s.seen > self.idle]:
+            del self._sessions[sid]
+        return session
+
+    def offer(self, session_id, frame, blur, usable=True, tips=None, now=None, brightness=None):
+        """Add a frame with its Laplacian variance; usable=False frames only update the motion baseline.
+
+        Non-empty tips (analyze_quality suggestions) are remembered and returned by suggestions().
+        """
+        now = time.monotonic() if now is None else now
+        thumb = thumbnail(frame)
+        with self._lock:
+            self.offered += 1
+            session = self._session(session_id, now)
+            moved = motion(thumb, session.last)
+            session.last = thumb
+            if tips:
+                session.tips = list(tips)
+            if usable:
+                session.frames.append((now, frame, blur, moved, brightness))
+            frames = session.frames
+            if not frames or (len(frames) < self.size and now - frames[0][0] < self.window):
+                return None, None, "collecting"
+
+            stable = [f for f in frames if f[3] is not None and f[3] <= self.max_motion]
+            frames.clear()
+            if not stable:
+                self.unstable += 1
+                return None, None, "unstable"
+            self.selected += 1
+            _, best, blur, _, brightness = max(stable, key=lambda f: f[2])
+            return best, (None if brightness is None else (blur, brightness)), "selected"
+
+    def suggestions(self, session_id):
+        """The last non-empty suggestions for a session, shown while a window is still collecting."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return list(session.tips) if session is not None else []
+
+    def reset(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "buffered_frames": sum(len(s.frames) for s in self._sessions.values()),
+                "window_s": self.window,
+                "max_frames": self.size,
+                "offered": self.offered,
+                "selected": self.selected,
+                "unstable": self.unstable,
+                "ocr_ratio": round(self.selected / self.offered, 4) if self.offered else 0.0,
+            }
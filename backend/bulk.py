@@ -0,0 +1,176 @@
+"""OCR a directory or archive of images with a process pool, writing one JSON line per image.
+
+    python bulk.py images/saved --output results.jsonl --workers 4
+
+Re-running with the same --output skips images already recorded there, so an
+interrupted run picks up where it stopped; images that failed are retried and their
+old error lines dropped.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+def iter_inputs(source):
+    """Yield (name, path_or_bytes); archives are read member by member so only in-flight images are in memory."""
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(EXTENSIONS):
+                    yield info.filename, zf.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as tf:
+            for member in tf:
+                if member.isfile() and member.name.lower().endswith(EXTENSIONS):
+                    yield member.name, tf.extractfile(member).read()
+    else:
+        raise ValueError(f"Not a directory or archive: {source}")
+
+
+def ocr_one(name, data):
+    import cv2
+    import numpy as np
+    from text import extract_structured
+
+    started = time.perf_counter()
+    record = {"filename": name, "text": "", "confidence": 0.0}
+    try:
+        if isinstance(data, bytes):
+            frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        else:
+            frame = cv2.imread(data)
+        decoded = time.perf_counter()
+        if frame is None:
+            record["error"] = "Could not decode image."
+        else:
+            result = extract_structured(frame)
+            if result is not None:
+                for key in ("text", "confidence", "tier", "lines"):
+                    record[key] = result[key]
+        record["timings_ms"] = {
+            "decode": round((decoded - started) * 1000, 2),
+            "ocr": round((time.perf_counter() - decoded) * 1000, 2),
+        }
+    except Exception as e:
+        record["error"] = str(e) or e.__class__.__name__
+    record.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 2)
+    return record
+
+
+def clamp_workers(workers):
+    """Worker count as an int in 1..cpu_count; anything unparsable means one per CPU."""
+    cpus = os.cpu_count() or 1
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        return cpus
+    return min(max(workers, 1), cpus)
+
+
+def load_checkpoint(output):
+    """Filenames already recorded without an error.
+
+    Error lines and lines cut short by an interrupted run are dropped from output, so the
+    retried images do not end up recorded twice.
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+    kept = []
+    dropped = 0
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                dropped += 1
+                continue
+            if "error" in record:
+                dropped += 1
+                continue
+            done.add(record["filename"])
+            kept.append(line if line.endswith("\n") else line + "\n")
+    if dropped:
+        tmp = output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp, output)
+    return done
+
+
+def run_bulk(source, output, workers=None, progress=None, progress_every=10):
+    """Process source into output (JSONL); returns a summary dict. progress(summary) is called as files finish."""
+    workers = clamp_workers(workers)
+    done = load_checkpoint(output)
+    summary = {"source": source, "output": output, "processed": 0, "skipped": 0, "errors": 0,
+               "images_per_sec": 0.0, "elapsed_s": 0.0, "finished": False}
+    started = time.perf_counter()
+
+    def record_done(f, out):
+        record = f.result()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        summary["processed"] += 1
+        if "error" in record:
+            summary["errors"] += 1
+        elapsed = time.perf_counter() - started
+        summary["elapsed_s"] = round(elapsed, 2)
+        summary["images_per_sec"] = round(summary["processed"] / elapsed, 3) if elapsed else 0.0
+        if progress and summary["processed"] % progress_every == 0:
+            progress(dict(summary))
+
+    # spawn, not fork: the server process has threads (Flask, the OCR pool collector) that fork would copy mid-lock
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+    with open(output, "a", encoding="utf-8") as out, executor as ex:
+        pending = set()
+        for name, data in iter_inputs(source):
+            if name in done:
+                summary["skipped"] += 1
+                continue
+            pending.add(ex.submit(ocr_one, name, data))
+            # keep a bounded number of images in flight
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in finished:
+                    record_done(f, out)
+        for f in wait(pending).done:
+            record_done(f, out)
+
+    summary["finished"] = True
+    if progress:
+        progress(dict(summary))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="directory, .zip or .tar(.gz) of images")
+    parser.add_argument("--output", default="bulk_results.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    def report(s):
+        print(f"{s['processed']} done, {s['skipped']} skipped, {s['errors']} errors, "
+              f"{s['images_per_sec']} images/s", file=sys.stderr)
+
+    summary = run_bulk(args.source, args.output, args.workers, progress=report)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+from collections import deque
+
+import cv2 as cv
+
+CAMERA_INDEX = os.getenv("CAMERA_INDEX")
+CAMERA_MAX_PROBE = int(os.getenv("CAMERA_MAX_PROBE", "4"))
+CAMERA_FPS = float(os.getenv("CAMERA_FPS", "15"))
+CAMERA_IDLE_SECONDS = float(os.getenv("CAMERA_IDLE_SECONDS", "10"))
+CAMERA_BUFFER = int(os.getenv("CAMERA_BUFFER", "4"))
+CAMERA_MAX_FAILURES = 30
+
+
+class CameraBroadcaster:
+    """Owns the capture device and shares JPEG-encoded frames with every /video_feed client."""
+
+    def __init__(self, fps=CAMERA_FPS, idle_seconds=CAMERA_IDLE_SECONDS, buffer_size=CAMERA_BUFFER):
+        self.fps = fps
+        self.idle_seconds = idle_seconds
+        self.index = int(CAMERA_INDEX) if CAMERA_INDEX is not None else None
+        self._frames = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._subscribers = 0
+        self._last_subscriber = time.time()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _open(self):
+        candidates = [self.index] if self.index is not None else range(CAMERA_MAX_PROBE)
+        for idx in candidates:
+            cam = cv.VideoCapture(idx)
+            if cam.isOpened():
+                self.index = idx
+                return cam
+            cam.release()
+        self.index = None
+        return None
+
+    def _run(self):
+        cam = self._open()
+        interval = 1.0 / self.fps if self.fps > 0 else 0
+        failures = 0
+        try:
+            while cam is not None:
+                with self._cond:
+                    if self._subscribers == 0 and time.time() - self._last_subscriber > self.idle_seconds:
+                        self._thread = None
+                        break
+                started = time.perf_counter()
+                ok, frame = cam.read()
+                if not ok:
+                    failures += 1
+                    if failures >= CAMERA_MAX_FAILURES:
+                        cam.release()
+                        cam = self._open()
+                        failures = 0
+                    time.sleep(0.05)
+                    continue
+                failures = 0
+                ok, buf = cv.imencode(".jpg", frame)
+                if ok:
+                    with self._cond:
+                        self._seq += 1
+                        self._frames.append((self._seq, buf.tobytes()))
+                        self._cond.notify_all()
+                delay = interval - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            if cam is not None:
+                cam.release()
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                self._cond.notify_all()
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._frames.clear()
+            self._thread = threading.Thread(target=self._run, name="camera", daemon=True)
+            self._thread.start()
+
+    def subscribe(self):
+        with self._cond:
+            self._subscribers += 1
+            self._ensure_running()
+        last_seq = 0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._thread is None or (self._frames and self._frames[-1][0] > last_seq),
+                        timeout=5,
+                    )
+                    if self._thread is None:
+                        break
+                    if not self._frames or self._frames[-1][0] <= last_seq:
+                        continue
+                    last_seq, jpeg = self._frames[-1]
+                yield jpeg
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+                self._last_subscriber = time.time()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "running": self._thread is not None,
+                "device_index": self.index,
+                "subscribers": self._subscribers,
+                "frames": self._seq,
+            }
+
+
+BROADCASTER = CameraBroadcaster()
+
+
+def generate_frames():
+    for jpeg in BROADCASTER.subscribe():
+        yield b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
@@ -1,70 +1,323 @@
-from docx import Document
-from pptx import Presentation
-import pandas as pd
 import csv
 import io
-from fpdf import FPDF
+import os
+import re
+import hashlib
+import inspect
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from xml.sax.saxutils import escape
 
-from text import extract_text_from_image
+import metrics
 
+CHUNK_SIZE = 64 * 1024
+XLSX_CELL_CHARS = 32767
+# characters XML 1.0 does not allow, even escaped
+XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+EXPORT_CACHE_BYTES = int(os.getenv("EXPORT_CACHE_BYTES", str(64 * 1024 * 1024)))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "4"))
 
+# file_type -> (filename, mime, builder); builders import their library on first use
+EXPORTERS = {}
+
+
+def exporter(file_type, filename, mime):
+    def register(fn):
+        EXPORTERS[file_type] = (filename, mime, fn)
+        return fn
+    return register
+
+
+@exporter("pdf", "scan.pdf", "application/pdf")
+def build_pdf(text):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=12)
+    for line in text.splitlines() or [text]:
+        pdf.multi_cell(0, 8, line)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+@exporter("docx", "scan.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+def build_docx(text):
+    from docx import Document
+
+    buf = io.BytesIO()
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(buf)
+    return buf.getvalue()
+
+
+@exporter("pptx", "scan.pptx", "application/vnd.openxmlformats-officedocument.presentationml.presentation")
+def build_pptx(text):
+    from pptx import Presentation
+
+    buf = io.BytesIO()
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.placeholders[1].text = text
+    prs.save(buf)
+    return buf.getvalue()
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def write_xlsx(rows):
+    """Minimal single-sheet xlsx writer (inline strings), so exports don't need pandas/openpyxl."""
+    sheet = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>']
+    for r, row in enumerate(rows, start=1):
+        sheet.append(f'<row r="{r}">')
+        for value in row:
+            value = escape(XML_ILLEGAL.sub("", str(value))[:XLSX_CELL_CHARS])
+            sheet.append(f'<c t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>')
+        sheet.append("</row>")
+    sheet.append("</sheetData></worksheet>")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in XLSX_PARTS.items():
+            zf.writestr(name, xml)
+        zf.writestr("xl/worksheets/sheet1.xml", "".join(sheet))
+    return buf.getvalue()
+
+
+@exporter("xlsx", "scan.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+def build_xlsx(text):
+    return write_xlsx([["Content"], [text]])
+
+
+@exporter("csv", "scan.csv", "text/csv")
+def build_csv(text):
+    buf = io.StringIO()
+    csv.writer(buf).writerow([text])
+    yield buf.getvalue().encode("utf-8")
+
+
+@exporter("html", "scan.html", "text/html")
+def build_html(text):
+    yield b"<html><body><p>"
+    yield text.encode("utf-8")
+    yield b"</p></body></html>"
+
+
+@exporter("txt", "scan.txt", "text/plain")
+def build_txt(text):
+    data = text.encode("utf-8")
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+
+def stream_export(text, file_type):
+    """Return (filename, mime, body) where body is bytes or an iterator of byte chunks."""
+    entry = EXPORTERS.get((file_type or "pdf").lower())
+    if entry is None:
+        return None, None, None
+    filename, mime, build = entry
+    return filename, mime, build(text)
+
+
+@metrics.timed("build_export")
 def build_export(text, file_type):
+    filename, mime, body = stream_export(text, file_type)
+    if body is None:
+        return None, None, None
+    if not isinstance(body, bytes):
+        body = b"".join(body)
+    return filename, mime, body
+
+
+class ExportCache:
+    """LRU of built artifacts keyed by (text hash, file_type), bounded by total size in bytes."""
+
+    def __init__(self, max_bytes=EXPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry[2])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old[2])
+            self._items[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted[2])
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+EXPORT_CACHE = ExportCache()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+        return _executor
+
+
+def _cache_key(text, file_type):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest(), file_type
+
+
+def build_cached(text, file_type):
     file_type = (file_type or "pdf").lower()
+    key = _cache_key(text, file_type)
+    entry = EXPORT_CACHE.get(key)
+    if entry is None:
+        entry = build_export(text, file_type)
+        if entry[2] is not None:
+            EXPORT_CACHE.put(key, entry)
+    return entry
 
-    if file_type == "pdf":
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_font("Arial", size=12)
-        for line in text.splitlines() or [text]:
-            pdf.multi_cell(0, 8, line)
-        data = pdf.output(dest="S").encode("latin-1")
-        return "scan.pdf", "application/pdf", data
-
-    if file_type == "docx":
-        buf = io.BytesIO()
-        doc = Document()
-        doc.add_paragraph(text)
-        doc.save(buf)
-        return "scan.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", buf.getvalue()
-
-    if file_type == "pptx":
-        buf = io.BytesIO()
-        prs = Presentation()
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        slide.placeholders[1].text = text
-        prs.save(buf)
-        return "scan.pptx", "application/vnd.openxmlformats-officedocument.presentationml.presentation", buf.getvalue()
-
-    if file_type == "xlsx":
-        buf = io.BytesIO()
-        pd.DataFrame([{"Content": text}]).to_excel(buf, index=False)
-        return "scan.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", buf.getvalue()
-
-    if file_type == "csv":
-        buf = io.StringIO()
-        csv.writer(buf).writerow([text])
-        data = buf.getvalue().encode("utf-8")
-        return "scan.csv", "text/csv", data
-
-    if file_type == "html":
-        data = f"<html><body><p>{text}</p></body></html>".encode("utf-8")
-        return "scan.html", "text/html", data
-
-    if file_type == "txt":
-        data = text.encode("utf-8")
-        return "scan.txt", "text/plain", data
-
-    return None, None, None
+
+def stream_cached(text, file_type):
+    """stream_export() through EXPORT_CACHE: a hit is served from memory, a streamed miss is cached once complete.
+
+    Builders that return bytes run before this returns, so a failing build raises here, not mid-response.
+    """
+    file_type = (file_type or "pdf").lower()
+    key = _cache_key(text, file_type)
+    entry = EXPORT_CACHE.get(key)
+    if entry is not None:
+        return entry
+    if file_type not in EXPORTERS:
+        return None, None, None
+    filename, mime, build = EXPORTERS[file_type]
+    if not inspect.isgeneratorfunction(build):
+        entry = build_export(text, file_type)
+        EXPORT_CACHE.put(key, entry)
+        return entry
+
+    def tee():
+        # timed here, not around the call: a generator builder does its work as the response is read
+        chunks = []
+        with metrics.stage("build_export"):
+            for chunk in build(text):
+                chunks.append(chunk)
+                yield chunk
+        EXPORT_CACHE.put(key, (filename, mime, b"".join(chunks)))
+
+    return filename, mime, tee()
+
+
+class _ZipSink(io.RawIOBase):
+    # write-only, non-seekable target so zipfile streams entries as they are added
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_batch_zip(text, file_types):
+    """Build every requested format concurrently and yield one ZIP archive as the builds finish.
+
+    The response headers are already sent, so a format that fails to build becomes an
+    errors/<format>.txt entry instead of breaking the archive.
+    """
+    file_types = list(OrderedDict.fromkeys((t or "").lower() for t in file_types))
+    executor = _get_executor()
+    futures = {executor.submit(build_cached, text, t): t for t in file_types}
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for future in as_completed(futures):
+            try:
+                filename, _, data = future.result()
+            except Exception as e:
+                filename, data = f"errors/{futures[future]}.txt", f"Could not build {futures[future]}: {e!r}\n"
+            if data is None:
+                continue
+            zf.writestr(filename, data)
+            yield sink.drain()
+    yield sink.drain()
 
 
 if __name__ == "__main__":
+    from text import extract_text_from_image
+
     user_choice = input("Enter format (docx, pptx, pdf, csv, html, txt, or xlsx): ").lower()
-    text = extract_text_from_image()
+    text, _ = extract_text_from_image()
     filename, _, data = build_export(text, user_choice)
     if not data:
         print("Invalid choice! Please run again and pick docx, pptx, pdf, xlsx, csv, html, or txt.")
     else:
         with open(filename, "wb") as f:
             f.write(data)
-        print(f"Finished! Your {user_choice} file is ready.")
\ No newline at end of file
+        print(f"Finished! Your {user_choice} file is ready.")
@@ -0,0 +1,105 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TTL = float(os.getenv("JOB_TTL", "600"))
+
+
+class Job:
+    def __init__(self, key, fn, args):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.replaced = 0
+
+    def to_dict(self):
+        data = {"job_id": self.id, "status": self.status, "replaced_frames": self.replaced}
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["message"] = self.error
+        return data
+
+
+class JobManager:
+    """Runs one job per key (a scan session) at a time; a newer submission replaces a job still waiting in the queue."""
+
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-job")
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._queued = {}
+        self._running = {}
+
+    def submit(self, key, fn, *args):
+        with self._cond:
+            self._prune()
+            queued = self._queued.get(key)
+            if queued is not None:
+                queued.fn, queued.args = fn, args
+                queued.replaced += 1
+                return queued
+            job = Job(key, fn, args)
+            self._jobs[job.id] = job
+            if key in self._running:
+                self._queued[key] = job
+            else:
+                self._start(job)
+            return job
+
+    def _start(self, job):
+        job.status = "running"
+        self._running[job.key] = job
+        self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            result, error = job.fn(*job.args), None
+        except Exception as e:
+            result, error = None, str(e) or e.__class__.__name__
+        with self._cond:
+            job.result, job.error = result, error
+            job.status = "error" if error else "done"
+            job.finished = time.time()
+            job.fn = job.args = None
+            self._running.pop(job.key, None)
+            nxt = self._queued.pop(job.key, None)
+            if nxt is not None:
+                self._start(nxt)
+            self._cond.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, last_status=None, timeout=15):
+        """Block until the job leaves last_status (or timeout) and return its current state."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._cond.wait_for(lambda: job.status != last_status, timeout=timeout)
+            return job.to_dict()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "jobs": len(self._jobs),
+                "queued": len(self._queued),
+                "running": len(self._running),
+            }
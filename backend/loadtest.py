@@ -0,0 +1,230 @@
+"""Drive the server with concurrent clients against local stand-in upstreams and report latency per endpoint.
+
+    python loadtest.py --serve asgi --concurrency 64 --duration 20
+    python loadtest.py --serve dev --mix translate=1
+    python loadtest.py --url http://localhost:5000     # a server that is already running
+
+Translation uses the "local" backend with TRANSLATE_LOCAL_LATENCY, a blocking call on the translator
+pool just like the Google backend, and AI summaries go to a stand-in OpenAI chat completions server,
+so runs are repeatable and never touch the real upstreams.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmark import HERE, git_commit, load_corpus, percentile
+
+DEFAULT_MIX = "translate=4,ai_summarize=2,analyze_text=2,ocr=1"
+
+
+class StandInOpenAI(BaseHTTPRequestHandler):
+    """Answers POST .../chat/completions after `latency` seconds, like a slow model endpoint."""
+
+    latency = 0.5
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.latency)
+        body = json.dumps({
+            "id": "standin", "object": "chat.completion", "created": int(time.time()), "model": "standin",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "A short stand-in summary."}}],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_upstream(latency):
+    StandInOpenAI.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInOpenAI)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def start_server(mode, port, upstream_url, latency, workers):
+    env = dict(os.environ, PORT=str(port), TRANSLATE_BACKEND="local", TRANSLATE_LOCAL_LATENCY=str(latency),
+               OPENAI_BASE_URL=upstream_url, OPENAI_API_KEY="standin", SAVE_CAPTURES="0")
+    if mode == "asgi":
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--workers", str(workers),
+               "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "app.py"]
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {proc.returncode}")
+        try:
+            urllib.request.urlopen(url + "/api/camera_stats", timeout=1).read()
+            return proc, url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    stop_server(proc)
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def stop_server(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proc.pid, signal.SIGKILL)
+
+
+def build_requests():
+    """name -> fn() returning (path, body, content_type); texts are unique so caches never answer."""
+    corpus = load_corpus(limit=5)
+    images = []
+    for path in corpus:
+        with open(path, "rb") as f:
+            images.append(f.read())
+
+    def text():
+        return f"The quick brown fox {uuid.uuid4().hex} jumps over the lazy dog. It was not amused."
+
+    def as_json(data):
+        return json.dumps(data).encode("utf-8"), "application/json"
+
+    requests = {
+        "translate": lambda: ("/api/translate", *as_json({"text": text(), "target_language": "fr"})),
+        "ai_summarize": lambda: ("/api/ai_summarize", *as_json({"text": text()})),
+        "analyze_text": lambda: ("/api/analyze_text", *as_json({"text": text()})),
+    }
+    if images:
+        requests["ocr"] = lambda: ("/api/ocr_structured", random.choice(images), "image/jpeg")
+    return requests
+
+
+def parse_mix(mix, available):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() in available:
+            weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def run_load(url, weights, requests, concurrency, duration, timeout):
+    samples = []
+    lock = threading.Lock()
+    names = list(weights)
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            name = random.choices(names, weights=[weights[n] for n in names])[0]
+            path, body, content_type = requests[name]()
+            req = urllib.request.Request(url + path, data=body, headers={"Content-Type": content_type})
+            started = time.monotonic()
+            try:
+                with urllib.request.urlopen(req, timeout=timeout) as resp:
+                    resp.read()
+                    status = resp.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except (urllib.error.URLError, OSError):
+                status = 0
+            with lock:
+                samples.append((name, status, time.monotonic() - started))
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.monotonic() - started
+
+
+def summarize(samples, elapsed):
+    report = {"requests": len(samples), "requests_per_sec": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+              "endpoints": {}}
+    for name in sorted({s[0] for s in samples}):
+        rows = [s for s in samples if s[0] == name]
+        ok = [s[2] * 1000 for s in rows if 200 <= s[1] < 300]
+        report["endpoints"][name] = {
+            "requests": len(rows),
+            "ok": len(ok),
+            "busy_503": sum(1 for s in rows if s[1] == 503),
+            "errors": sum(1 for s in rows if s[1] != 503 and not 200 <= s[1] < 300),
+            "p50_ms": round(percentile(ok, 50), 1) if ok else None,
+            "p95_ms": round(percentile(ok, 95), 1) if ok else None,
+            "p99_ms": round(percentile(ok, 99), 1) if ok else None,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--serve", choices=("asgi", "dev"), default="asgi", help="server to start")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--web-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--upstream-latency", type=float, default=0.5, help="seconds per stand-in upstream call")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--output", default="load_results.json")
+    args = parser.parse_args(argv)
+
+    requests = build_requests()
+    weights = parse_mix(args.mix, requests)
+    if not weights:
+        print("No known endpoints in --mix; choose from", ", ".join(requests))
+        return 1
+
+    upstream, upstream_url = start_upstream(args.upstream_latency)
+    proc = None
+    try:
+        url = args.url
+        if url is None:
+            proc, url = start_server(args.serve, args.port, upstream_url, args.upstream_latency, args.web_workers)
+        samples, elapsed = run_load(url.rstrip("/"), weights, requests, args.concurrency, args.duration,
+                                    args.timeout)
+    finally:
+        if proc is not None:
+            stop_server(proc)
+        upstream.shutdown()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "serve": "external" if args.url else args.serve,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "upstream_latency_s": args.upstream_latency,
+        "mix": weights,
+        **summarize(samples, elapsed),
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, stats in results["endpoints"].items():
+        print(f"{name:14} n={stats['requests']:>6} ok={stats['ok']:>6} 503={stats['busy_503']:>4} "
+              f"err={stats['errors']:>4} p50={stats['p50_ms'] or '-'}ms p95={stats['p95_ms'] or '-'}ms")
+    print(f"{results['requests_per_sec']} requests/s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_histograms = {}
+_in_flight = {}
+_errors = {}
+_counters = {}
+_collectors = []
+_trace = contextvars.ContextVar("stage_trace", default=None)
+
+
+def observe(stage, seconds):
+    with _lock:
+        h = _histograms.get(stage)
+        if h is None:
+            h = _histograms[stage] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h["buckets"][i] += 1
+        h["count"] += 1
+        h["sum"] += seconds
+    trace = _trace.get()
+    if trace is not None:
+        trace.append((stage, seconds))
+
+
+def error(stage):
+    with _lock:
+        _errors[stage] = _errors.get(stage, 0) + 1
+
+
+def count(metric, label, n=1):
+    """Labelled event counter, exposed as <metric>_total{name=label}."""
+    with _lock:
+        values = _counters.setdefault(metric, {})
+        values[label] = values.get(label, 0) + n
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage: latency histogram, in-flight gauge, error counter and request trace."""
+    with _lock:
+        _in_flight[name] = _in_flight.get(name, 0) + 1
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        error(name)
+        raise
+    finally:
+        observe(name, time.perf_counter() - started)
+        with _lock:
+            _in_flight[name] -= 1
+
+
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def register_collector(fn):
+    """fn() returns [(metric_name, help, {label: value} or value)] gauges evaluated at scrape time."""
+    _collectors.append(fn)
+
+
+def start_trace():
+    return _trace.set([])
+
+
+def end_trace(token):
+    trace = _trace.get() or []
+    _trace.reset(token)
+    return trace
+
+
+def server_timing(trace):
+    return ", ".join(f'{name.replace(".", "_")};dur={seconds * 1000:.2f}' for name, seconds in trace)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def render():
+    """Prometheus text exposition format."""
+    lines = [
+        "# HELP ocr_stage_seconds Latency of each pipeline stage.",
+        "# TYPE ocr_stage_seconds histogram",
+    ]
+    with _lock:
+        histograms = {k: dict(v, buckets=list(v["buckets"])) for k, v in _histograms.items()}
+        in_flight = dict(_in_flight)
+        errors = dict(_errors)
+        counters = {k: dict(v) for k, v in _counters.items()}
+    for name, h in sorted(histograms.items()):
+        for bound, count in zip(BUCKETS, h["buckets"]):
+            lines.append(f"ocr_stage_seconds_bucket{_labels(stage=name, le=bound)} {count}")
+        lines.append(f"ocr_stage_seconds_bucket{_labels(stage=name, le='+Inf')} {h['count']}")
+        lines.append(f"ocr_stage_seconds_sum{_labels(stage=name)} {h['sum']:.6f}")
+        lines.append(f"ocr_stage_seconds_count{_labels(stage=name)} {h['count']}")
+
+    lines += ["# HELP ocr_stage_in_flight Calls currently inside each stage.", "# TYPE ocr_stage_in_flight gauge"]
+    for name, value in sorted(in_flight.items()):
+        lines.append(f"ocr_stage_in_flight{_labels(stage=name)} {value}")
+
+    lines += ["# HELP ocr_stage_errors_total Exceptions raised by each stage.", "# TYPE ocr_stage_errors_total counter"]
+    for name, value in sorted(errors.items()):
+        lines.append(f"ocr_stage_errors_total{_labels(stage=name)} {value}")
+
+    for metric, values in sorted(counters.items()):
+        lines += [f"# HELP {metric}_total Events counted by {metric}.", f"# TYPE {metric}_total counter"]
+        for label, value in sorted(values.items()):
+            lines.append(f"{metric}_total{_labels(name=label)} {value}")
+
+    for collect in _collectors:
+        try:
+            gauges = collect()
+        except Exception:
+            continue
+        for metric, help_text, values in gauges:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            if isinstance(values, dict):
+                for label, value in sorted(values.items()):
+                    lines.append(f"{metric}{_labels(name=label)} {value}")
+            else:
+                lines.append(f"{metric} {values}")
+    return "\n".join(lines) + "\n"
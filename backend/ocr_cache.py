@@ -0,0 +1,130 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", "300"))
+OCR_CACHE_DISTANCE = int(os.getenv("OCR_CACHE_DISTANCE", "4"))
+OCR_CACHE_MIN_CONF = float(os.getenv("OCR_CACHE_MIN_CONF", "0.5"))
+
+
+def frame_hash(frame):
+    # 64-bit difference hash: compares neighbouring pixels of a 9x8 thumbnail
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def bytes_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class OCRCache:
+    """(text, confidence) results by exact upload bytes, and by near-identical frame per user."""
+
+    def __init__(self, max_size=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL, max_distance=OCR_CACHE_DISTANCE,
+                 min_conf=OCR_CACHE_MIN_CONF):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.min_conf = min_conf
+        self._exact = OrderedDict()
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at):
+        return self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def cacheable(self, value):
+        # a failed or doubtful read must not pin later frames of the same page to it
+        text, conf = value
+        return bool(text) and (conf or 0.0) >= self.min_conf
+
+    def _store(self, entries, key, value):
+        entries[key] = (time.time(), value)
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_bytes(self, data):
+        key = bytes_hash(data)
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    del self._exact[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._exact.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put_bytes(self, data, value):
+        if not self.cacheable(value):
+            return
+        with self._lock:
+            self._store(self._exact, bytes_hash(data), value)
+
+    def get_frame(self, frame, user_id=None, key=None):
+        key = frame_hash(frame) if key is None else key
+        with self._lock:
+            best = None
+            best_distance = self.max_distance + 1
+            for stored_key, (stored_at, _) in list(self._frames.items()):
+                if self._expired(stored_at):
+                    del self._frames[stored_key]
+                    self.evictions += 1
+                    continue
+                if stored_key[0] != user_id:
+                    continue
+                distance = hamming(key, stored_key[1])
+                if distance < best_distance:
+                    best, best_distance = stored_key, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(best)
+            self.hits += 1
+            return self._frames[best][1]
+
+    def put_frame(self, frame, value, user_id=None, key=None):
+        if not self.cacheable(value):
+            return
+        key = frame_hash(frame) if key is None else key
+        with self._lock:
+            self._store(self._frames, (user_id, key), value)
+
+    def clear(self):
+        with self._lock:
+            self._exact.clear()
+            self._frames.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._exact) + len(self._frames),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "max_distance": self.max_distance,
+                "min_conf": self.min_conf,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,338 @@
+import os
+import importlib.util
+import queue
+import threading
+import time
+import itertools
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import metrics
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "0")) or OCR_WORKERS * 2
+OCR_SUBMIT_TIMEOUT = float(os.getenv("OCR_SUBMIT_TIMEOUT", "2"))
+OCR_RESULT_TIMEOUT = float(os.getenv("OCR_RESULT_TIMEOUT", "60"))
+WATCH_INTERVAL = 1.0
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class OCRFailed(RuntimeError):
+    """A worker raised, died mid-job, or did not answer within OCR_RESULT_TIMEOUT."""
+
+
+class OCRFuture(Future):
+    """Future whose worker stage timings are observed by the thread that reads the result.
+
+    The collector thread resolves every future, but observing there would miss the request's
+    metrics trace; the reader is the request thread, so the timings show up in Server-Timing.
+    """
+
+    timings = None
+    tier = None
+
+    def result(self, timeout=None):
+        out = super().result(timeout)
+        timings, self.timings = self.timings, None
+        if timings is not None:
+            for stage, seconds in timings.items():
+                metrics.observe(stage, seconds)
+            if self.tier is not None:
+                metrics.count("ocr_tier", self.tier)
+        return out
+
+
+def ocr_engine():
+    """"tesserocr" when workers can keep an engine loaded, else "pytesseract" (a tesseract process per pass)."""
+    return "tesserocr" if importlib.util.find_spec("tesserocr") is not None else "pytesseract"
+
+
+def _load_engine(lang):
+    # without tesserocr (e.g. no libtesseract headers to build it) workers fall back to pytesseract
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    return tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.DEFAULT)
+
+
+def _ocr_structured(engine, img, lang, quality=None):
+    from adaptive import adaptive_ocr, pytesseract_reader, tesserocr_reader
+
+    read = pytesseract_reader(lang) if engine is None else tesserocr_reader(engine)
+    return adaptive_ocr(img, read, quality=quality)
+
+
+def _ocr_regions(engine, img, lang, boxes):
+    results = []
+    timings = {}
+    for x, y, w, h in boxes:
+        out = _ocr_structured(engine, img[y:y + h, x:x + w], lang)
+        for stage, seconds in out["timings"].items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        results.append((out["text"], out["confidence"]))
+    return results, timings
+
+
+def _worker(worker_id, tasks, results):
+    engines = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, shm_name, shape, dtype, lang, kind, quality, boxes = task
+        results.put(("start", job_id, worker_id, None))
+        started = time.perf_counter()
+        try:
+            if lang not in engines:
+                engines[lang] = _load_engine(lang)
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                img = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+            finally:
+                shm.close()
+            if boxes is not None:
+                out, timings = _ocr_regions(engines[lang], img, lang, boxes)
+                tier = None
+            else:
+                out = _ocr_structured(engines[lang], img, lang, quality)
+                timings, tier = out["timings"], out["tier"]
+                if kind == "text":
+                    out = (out["text"], out["confidence"])
+            results.put(("done", job_id, worker_id, (out, time.perf_counter() - started, timings, tier)))
+        except Exception as e:
+            results.put(("error", job_id, worker_id, (repr(e), time.perf_counter() - started, {}, None)))
+    for engine in engines.values():
+        if engine is not None:
+            engine.End()
+
+
+class OCRPool:
+    def __init__(self, workers=OCR_WORKERS, queue_size=OCR_QUEUE_SIZE):
+        self._ctx = mp.get_context("spawn")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.engine = ocr_engine()
+        if self.engine != "tesserocr":
+            print("OCR pool: tesserocr is not installed; workers fall back to pytesseract, "
+                  "which starts a tesseract process per OCR pass")
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._frame_refs = {}
+        self._running = {}
+        self._busy_seconds = 0.0
+        self._completed = 0
+        self._errors = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._closing = False
+        self._started = time.time()
+        self._procs = [self._spawn(i) for i in range(workers)]
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def _spawn(self, worker_id):
+        proc = self._ctx.Process(target=_worker, args=(worker_id, self._tasks, self._results), daemon=True)
+        proc.start()
+        return proc
+
+    def submit(self, img, lang="eng", kind="text", quality=None, boxes=None, timeout=OCR_SUBMIT_TIMEOUT):
+        """Queue img for OCR; with boxes, the task returns the (text, confidence) of each (x, y, w, h) region."""
+        return self._submit_groups(img, [boxes], lang, kind, quality, timeout)[0]
+
+    def _submit_groups(self, img, groups, lang, kind, quality, timeout):
+        """Queue one task per box group, each holding a queue slot; all of them read one shared-memory copy of img."""
+        deadline = time.monotonic() + timeout
+        taken = 0
+        while taken < len(groups):
+            if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                for _ in range(taken):
+                    self._slots.release()
+                with self._lock:
+                    self._rejected += 1
+                raise PoolBusy("OCR queue is full.")
+            taken += 1
+        img = np.ascontiguousarray(img)
+        shm = shared_memory.SharedMemory(create=True, size=max(img.nbytes, 1))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+        futures = []
+        with self._lock:
+            self._frame_refs[shm.name] = len(groups)
+            for boxes in groups:
+                future = OCRFuture()
+                job_id = next(self._ids)
+                self._pending[job_id] = (future, shm)
+                self._tasks.put((job_id, shm.name, img.shape, img.dtype.str, lang, kind, quality, boxes))
+                futures.append(future)
+        return futures
+
+    def ocr(self, img, lang="eng", quality=None, boxes=None, timeout=OCR_RESULT_TIMEOUT):
+        if boxes is not None:
+            return self.ocr_regions(img, boxes, lang=lang, timeout=timeout)
+        return self._wait(self.submit(img, lang=lang, quality=quality), timeout)
+
+    def ocr_regions(self, img, boxes, lang="eng", timeout=OCR_RESULT_TIMEOUT):
+        """OCR the (x, y, w, h) boxes of img in parallel and merge them in order.
+
+        The boxes are split into at most `workers` consecutive groups, one task each, so a frame
+        with many regions uses every core without queueing a task per region.
+        """
+        from regions import merge_regions
+
+        n = max(min(self.workers, self.queue_size, len(boxes)), 1)
+        groups = [boxes[i * len(boxes) // n:(i + 1) * len(boxes) // n] for i in range(n)]
+        futures = self._submit_groups(img, groups, lang, "text", None, OCR_SUBMIT_TIMEOUT)
+        deadline = time.monotonic() + timeout
+        results = []
+        try:
+            for future in futures:
+                results.extend(self._wait(future, max(deadline - time.monotonic(), 0)))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        return merge_regions(results)
+
+    def ocr_structured(self, img, lang="eng", timeout=OCR_RESULT_TIMEOUT):
+        return self._wait(self.submit(img, lang=lang, kind="structured"), timeout)
+
+    @staticmethod
+    def _wait(future, timeout):
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise OCRFailed(f"OCR did not finish within {timeout:g}s.") from None
+
+    def _restart_if_dead(self):
+        """Replace the workers after one exits.
+
+        A killed worker may have died holding a queue lock, so the queues are replaced too and
+        every job still pending fails with OCRFailed instead of waiting forever.
+        """
+        dead = [p for p in self._procs if not p.is_alive()]
+        if not dead or self._closing:
+            return
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+            proc.join(timeout=5)
+        with self._lock:
+            self._tasks = self._ctx.Queue()
+            self._results = self._ctx.Queue()
+            lost = list(self._pending)
+            self._restarts += 1
+        reason = f"OCR worker exited with code {dead[0].exitcode}."
+        for job_id in lost:
+            self._finish("error", job_id, (reason, 0.0, {}, None))
+        self._procs = [self._spawn(i) for i in range(self.workers)]
+
+    def _collect(self):
+        while True:
+            try:
+                msg = self._results.get(timeout=WATCH_INTERVAL)
+            except queue.Empty:
+                self._restart_if_dead()
+                self._release_abandoned()
+                continue
+            if msg is None:
+                break
+            status, job_id, worker_id, payload = msg
+            if status == "start":
+                with self._lock:
+                    if job_id in self._pending:
+                        self._running[job_id] = worker_id
+                continue
+            self._finish(status, job_id, payload)
+
+    def _finish(self, status, job_id, payload):
+        with self._lock:
+            if job_id not in self._pending:
+                return
+            future, shm = self._pending.pop(job_id)
+            self._running.pop(job_id, None)
+            self._frame_refs[shm.name] -= 1
+            last = self._frame_refs[shm.name] == 0
+            if last:
+                del self._frame_refs[shm.name]
+            self._busy_seconds += payload[1]
+            if status == "done":
+                self._completed += 1
+            else:
+                self._errors += 1
+        if status != "done":
+            metrics.error("tesseract")
+        if last:
+            shm.close()
+            shm.unlink()
+        self._slots.release()
+        if future.cancelled():
+            return
+        if status == "done":
+            future.timings, future.tier = payload[2], payload[3]
+            future.set_result(payload[0])
+        else:
+            future.set_exception(OCRFailed(payload[0]))
+
+    def _release_abandoned(self):
+        """Free the slot and frame of timed-out jobs that never started (e.g. lost with a dead worker)."""
+        with self._lock:
+            abandoned = [job_id for job_id, (future, _) in self._pending.items()
+                         if future.cancelled() and job_id not in self._running]
+        for job_id in abandoned:
+            self._finish("error", job_id, ("OCR job abandoned.", 0.0, {}, None))
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+            running = len(self._running)
+            uptime = max(time.time() - self._started, 1e-6)
+            return {
+                "workers": self.workers,
+                "engine": self.engine,
+                "alive_workers": sum(p.is_alive() for p in self._procs),
+                "queue_size": self.queue_size,
+                "queue_depth": pending - running,
+                "busy_workers": running,
+                "utilization": round(min(self._busy_seconds / (uptime * self.workers), 1.0), 4),
+                "completed": self._completed,
+                "errors": self._errors,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+            }
+
+    def close(self):
+        self._closing = True
+        for _ in self._procs:
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join(timeout=5)
+        self._results.put(None)
+        self._collector.join(timeout=5)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def peek_pool():
+    """The pool if something already started it, else None; never boots one."""
+    return _POOL
+
+
+def get_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = OCRPool()
+        return _POOL
@@ -0,0 +1,148 @@
+import io
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+PAGES_IN_FLIGHT = int(os.getenv("PAGES_IN_FLIGHT", "4"))
+MAX_PAGES = int(os.getenv("MAX_PAGES", "500"))
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", "4"))
+PAGE_MAX_PIXELS = int(os.getenv("PAGE_MAX_PIXELS", "40000000"))
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(64 * 1024 * 1024)))
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="ocr-page")
+    return _executor
+
+
+class PageRejected(ValueError):
+    pass
+
+
+def is_tiff(path):
+    with open(path, "rb") as f:
+        return f.read(4) in TIFF_MAGIC
+
+
+def _zip_pages(zf):
+    return sorted(i.filename for i in zf.infolist() if not i.is_dir() and i.filename.lower().endswith(EXTENSIONS))
+
+
+def count_pages(path):
+    """Number of pages in a TIFF or ZIP document (1 for a single image), read from headers only."""
+    if is_tiff(path):
+        return cv2.imcount(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return len(_zip_pages(zf))
+    return 1
+
+
+def _check_pixels(source, index=0):
+    """Raise PageRejected when a page header declares more than PAGE_MAX_PIXELS, before decoding it."""
+    from PIL import Image
+
+    try:
+        with Image.open(source) as im:
+            im.seek(index)
+            w, h = im.size
+    except Image.DecompressionBombError as e:
+        raise PageRejected(str(e)) from None
+    except Exception:
+        return  # let cv2 decide whether it can read the page
+    if w * h > PAGE_MAX_PIXELS:
+        raise PageRejected(f"Page is {w}x{h} pixels; the limit is {PAGE_MAX_PIXELS}.")
+
+
+def iter_pages(path, max_pages=MAX_PAGES):
+    """Yield (name, frame) one decoded page at a time from a multi-page TIFF, a ZIP of images or one image.
+
+    frame is None for a page that could not be decoded, or a PageRejected for one over
+    PAGE_MAX_PIXELS (or PAGE_MAX_BYTES uncompressed in a ZIP); such pages are never decoded.
+    """
+    if is_tiff(path):
+        for i in range(min(cv2.imcount(path), max_pages)):
+            try:
+                _check_pixels(path, i)
+            except PageRejected as e:
+                yield f"page-{i + 1}", e
+                continue
+            ok, mats = cv2.imreadmulti(path, start=i, count=1, flags=cv2.IMREAD_COLOR)
+            yield f"page-{i + 1}", mats[0] if ok and mats else None
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in _zip_pages(zf)[:max_pages]:
+                size = zf.getinfo(name).file_size
+                if size > PAGE_MAX_BYTES:
+                    yield name, PageRejected(f"Page is {size} bytes uncompressed; the limit is {PAGE_MAX_BYTES}.")
+                    continue
+                data = zf.read(name)
+                try:
+                    _check_pixels(io.BytesIO(data))
+                except PageRejected as e:
+                    yield name, e
+                    continue
+                yield name, cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        try:
+            _check_pixels(path)
+        except PageRejected as e:
+            yield os.path.basename(path), e
+            return
+        yield os.path.basename(path), cv2.imread(path, cv2.IMREAD_COLOR)
+
+
+def _page_result(index, name, future, started):
+    item = {"page": index + 1, "name": name}
+    if future is None:
+        item.update(status="error", message="Could not decode page.")
+    else:
+        try:
+            text, conf = future.result()
+            item.update(status="success", text=text, confidence=conf)
+        except Exception as e:
+            item.update(status="error", message=str(e) or e.__class__.__name__)
+    item["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return item
+
+
+def ocr_pages(pages, submit=None, window=PAGES_IN_FLIGHT):
+    """OCR pages as a pipeline and yield one result dict per page, in page order.
+
+    The next page is decoded while earlier ones are in OCR; at most `window` pages are held at once.
+    submit(frame) must return a Future resolving to (text, confidence), like ocr_pool.OCRPool.submit.
+    """
+    from text import extract_text_from_array
+
+    if submit is None:
+        submit = lambda frame: _get_executor().submit(extract_text_from_array, frame)
+
+    started = time.monotonic()
+    in_flight = deque()
+    for index, (name, frame) in enumerate(pages):
+        future = None
+        if isinstance(frame, Exception):
+            future = Future()
+            future.set_exception(frame)
+        elif frame is not None:
+            try:
+                future = submit(frame)
+            except Exception as e:  # e.g. ocr_pool.PoolBusy; report it on this page and keep going
+                future = Future()
+                future.set_exception(e)
+        in_flight.append((index, name, future))
+        if len(in_flight) >= window:
+            yield _page_result(*in_flight.popleft(), started)
+    while in_flight:
+        yield _page_result(*in_flight.popleft(), started)
@@ -0,0 +1,113 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+MAX_PIXELS = int(os.getenv("PREPROCESS_MAX_PIXELS", "4000000"))
+SHARP_BLUR = float(os.getenv("PREPROCESS_SHARP_BLUR", "150"))
+SOFT_BLUR = float(os.getenv("PREPROCESS_SOFT_BLUR", "80"))
+FORCE_TIER = os.getenv("PREPROCESS_TIER") or None
+# mean gray level bounds of a well-lit frame; suggestion.analyze_quality uses the same ones
+DARK = 50
+BRIGHT = 230
+TIER_ORDER = ("cheap", "medium", "full")
+
+
+def limit_pixels(img, max_pixels=MAX_PIXELS):
+    h, w = img.shape[:2]
+    if max_pixels <= 0 or h * w <= max_pixels:
+        return img
+    scale = (max_pixels / float(h * w)) ** 0.5
+    return cv2.resize(img, (max(int(w * scale), 1), max(int(h * scale), 1)), interpolation=cv2.INTER_AREA)
+
+
+def measure(gray):
+    return cv2.Laplacian(gray, cv2.CV_64F).var(), float(np.mean(gray))
+
+
+def choose_tier(blur, brightness):
+    well_lit = DARK < brightness < BRIGHT
+    if blur > SHARP_BLUR and well_lit:
+        return "cheap"
+    if blur > SOFT_BLUR:
+        return "medium"
+    return "full"
+
+
+def _cheap(gray, timings):
+    t = time.perf_counter()
+    _, out = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    timings["threshold"] = (time.perf_counter() - t) * 1000
+    return out
+
+
+def _medium(gray, timings):
+    t = time.perf_counter()
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    gray = clahe.apply(gray)
+    timings["clahe"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    _, out = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    timings["threshold"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    out = cv2.morphologyEx(out, cv2.MORPH_OPEN, kernel)
+    timings["morphology"] = (time.perf_counter() - t) * 1000
+    return out
+
+
+def _full(gray, timings):
+    t = time.perf_counter()
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    timings["threshold"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    denoised = cv2.fastNlMeansDenoising(thresh, None, 10, 7, 21)
+    timings["denoise"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    enhanced = clahe.apply(denoised)
+    timings["clahe"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    enhanced = cv2.morphologyEx(enhanced, cv2.MORPH_OPEN, kernel)
+    enhanced = cv2.morphologyEx(enhanced, cv2.MORPH_CLOSE, kernel)
+    timings["morphology"] = (time.perf_counter() - t) * 1000
+    return enhanced
+
+
+TIERS = {"cheap": _cheap, "medium": _medium, "full": _full}
+
+
+def preprocess(img, tier=None, quality=None, max_pixels=MAX_PIXELS):
+    """Binarize img for OCR, picking the pipeline from blur/brightness; returns (image, report)."""
+    timings = {}
+    t = time.perf_counter()
+    img = limit_pixels(img, max_pixels)
+    timings["resize"] = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    timings["grayscale"] = (time.perf_counter() - t) * 1000
+
+    tier = tier or FORCE_TIER
+    if tier is None:
+        t = time.perf_counter()
+        blur, brightness = quality if quality is not None else measure(gray)
+        tier = choose_tier(blur, brightness)
+        timings["measure"] = (time.perf_counter() - t) * 1000
+
+    out = TIERS[tier](gray, timings)
+    timings = {k: round(v, 3) for k, v in timings.items()}
+    return out, {"tier": tier, "shape": out.shape[:2], "timings_ms": timings}
+
+
+def report_timings(report):
+    """A preprocess report's step timings as {"preprocess_<step>": seconds}, ready for metrics.observe."""
+    return {f"preprocess_{step}": ms / 1000 for step, ms in report["timings_ms"].items()}
@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+REGION_PADDING = 8
+REGION_MIN_AREA = 400
+REGION_MAX_COVERAGE = 0.8
+REGION_WORKERS = int(os.getenv("REGION_WORKERS", "0")) or os.cpu_count() or 1
+
+_executor = None
+
+
+def detect_text_regions(img, max_side=1600):
+    """Return padded (x, y, w, h) boxes around text lines, in reading order."""
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape[:2]
+    scale = min(1.0, max_side / float(max(h, w)))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+    mser = cv2.MSER_create()
+    mser.setMinArea(20)
+    mser.setMaxArea(int(small.shape[0] * small.shape[1] * 0.05))
+    _, bboxes = mser.detectRegions(small)
+
+    mask = np.zeros_like(small)
+    for x, y, bw, bh in bboxes:
+        if bh > 0 and 0.1 < bw / float(bh) < 10:
+            mask[y:y + bh, x:x + bw] = 255
+
+    # join characters into words and words into lines
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 5))
+    mask = cv2.dilate(mask, kernel, iterations=1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for c in contours:
+        x, y, bw, bh = cv2.boundingRect(c)
+        x, y, bw, bh = [int(round(v / scale)) for v in (x, y, bw, bh)]
+        if bw * bh < REGION_MIN_AREA:
+            continue
+        x0, y0 = max(x - REGION_PADDING, 0), max(y - REGION_PADDING, 0)
+        x1, y1 = min(x + bw + REGION_PADDING, w), min(y + bh + REGION_PADDING, h)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    return sort_reading_order(boxes)
+
+
+def sort_reading_order(boxes):
+    rows = []
+    for box in sorted(boxes, key=lambda b: b[1]):
+        center = box[1] + box[3] / 2.0
+        for row in rows:
+            top, bottom = row[0]
+            if top <= center <= bottom:
+                row[1].append(box)
+                break
+        else:
+            rows.append([(box[1], box[1] + box[3]), [box]])
+    ordered = []
+    for _, row in rows:
+        ordered.extend(sorted(row, key=lambda b: b[0]))
+    return ordered
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=REGION_WORKERS, thread_name_prefix="ocr-region")
+    return _executor
+
+
+def merge_regions(results):
+    """Join per-region (text, confidence) results in order; confidence is the mean over regions with text."""
+    texts = []
+    confs = []
+    for text, conf in results:
+        if text:
+            texts.append(text)
+            confs.append(conf or 0.0)
+    if not texts:
+        return "", 0.0
+    return "\n".join(texts), round(sum(confs) / len(confs), 3)
+
+
+def extract_text_by_regions(img, ocr=None):
+    """OCR each detected text region and merge the results in reading order.
+
+    ocr(img, boxes=...) must return the merged (text, confidence) for those regions of img, like
+    ocr_pool.OCRPool.ocr, which splits the boxes into at most one task per worker over a single
+    shared-memory copy of the frame. Without it the regions run in parallel on a shared thread
+    pool with text.extract_text_from_array.
+    """
+    from text import extract_text_from_array
+
+    boxes = detect_text_regions(img)
+    h, w = img.shape[:2]
+    covered = sum(bw * bh for _, _, bw, bh in boxes)
+    if not boxes or covered > REGION_MAX_COVERAGE * h * w:
+        boxes = [(0, 0, w, h)]
+
+    if ocr is not None:
+        return ocr(img, boxes=boxes)
+    futures = [_get_executor().submit(extract_text_from_array, img[y:y + bh, x:x + bw]) for x, y, bw, bh in boxes]
+    return merge_regions(f.result() for f in futures)
@@ -0,0 +1,171 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "3600"))
+SESSION_DB = os.getenv("SESSION_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db"))
+
+
+def _pack(value):
+    return zlib.compress(value.encode("utf-8"), 6)
+
+
+def _unpack(blob):
+    return zlib.decompress(blob).decode("utf-8")
+
+
+class _Metrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MemoryStore:
+    """Per-process LRU with TTL; values are kept zlib-compressed."""
+
+    def __init__(self, max_entries=SESSION_MAX_ENTRIES, ttl=SESSION_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = _Metrics()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and self.ttl > 0 and time.time() - entry[0] > self.ttl:
+                del self._items[key]
+                self.metrics.evictions += 1
+                entry = None
+            if entry is None:
+                self.metrics.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.metrics.hits += 1
+            blob = entry[1]
+        return _unpack(blob)
+
+    def set(self, key, value):
+        blob = _pack(value)
+        with self._lock:
+            self._items[key] = (time.time(), blob)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.metrics.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            data = self.metrics.as_dict()
+            data.update({
+                "backend": "memory",
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(blob) for _, blob in self._items.values()),
+            })
+            return data
+
+
+class SQLiteStore:
+    """Shared store for multi-worker deployments: one SQLite file in WAL mode, LRU by access time."""
+
+    def __init__(self, path=SESSION_DB, max_entries=SESSION_MAX_ENTRIES, ttl=SESSION_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self.metrics = _Metrics()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, updated REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed)")
+        db.commit()
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key, default=None):
+        db = self._db()
+        now = time.time()
+        row = db.execute("SELECT value, updated FROM sessions WHERE key = ?", (key,)).fetchone()
+        if row is not None and self.ttl > 0 and now - row[1] > self.ttl:
+            with db:
+                db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+            self.metrics.evictions += 1
+            row = None
+        if row is None:
+            self.metrics.misses += 1
+            return default
+        with db:
+            db.execute("UPDATE sessions SET accessed = ? WHERE key = ?", (now, key))
+        self.metrics.hits += 1
+        return _unpack(row[0])
+
+    def set(self, key, value):
+        db = self._db()
+        now = time.time()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, updated, accessed) VALUES (?, ?, ?, ?)",
+                (key, _pack(value), now, now),
+            )
+            cur = db.execute(
+                "DELETE FROM sessions WHERE key IN ("
+                "SELECT key FROM sessions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            if self.ttl > 0:
+                cur2 = db.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl,))
+                self.metrics.evictions += max(cur2.rowcount, 0)
+        self.metrics.evictions += max(cur.rowcount, 0)
+
+    def delete(self, key):
+        db = self._db()
+        with db:
+            db.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def stats(self):
+        row = self._db().execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM sessions").fetchone()
+        data = self.metrics.as_dict()
+        data.update({
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": row[0],
+            "max_entries": self.max_entries,
+            "bytes": row[1],
+        })
+        return data
+
+
+BACKENDS = {"memory": MemoryStore, "sqlite": SQLiteStore}
+
+
+def create_store(backend=SESSION_BACKEND):
+    return BACKENDS[backend]()
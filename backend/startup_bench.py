@@ -0,0 +1,80 @@
+"""Import app.py in fresh interpreters and report import time and baseline RSS per worker.
+
+    python startup_bench.py --runs 5
+    python startup_bench.py --check    # exit 1 when over budget or a lazy backend was imported
+
+Every worker and autoscaled replica pays this cost before serving its first request, so the
+export formats, translation, OpenAI and pytesseract/pandas must stay out of the import graph.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmark import HERE, git_commit, percentile
+
+STARTUP_BUDGET_S = float(os.getenv("STARTUP_BUDGET_S", "1.0"))
+STARTUP_RSS_MB = float(os.getenv("STARTUP_RSS_MB", "120"))
+LAZY_MODULES = ("pandas", "docx", "pptx", "fpdf", "deep_translator", "openai", "pytesseract", "tesserocr")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+with open("/proc/self/status") as f:
+    rss = next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), 0)
+print(json.dumps({"import_s": elapsed, "rss_mb": rss / 1024,
+                  "lazy_loaded": [m for m in %r if m in sys.modules], "modules": len(sys.modules)}))
+"""
+
+
+def measure_once():
+    out = subprocess.check_output([sys.executable, "-c", CHILD % (LAZY_MODULES,)], cwd=HERE, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="fail when over the startup budget")
+    parser.add_argument("--budget-s", type=float, default=STARTUP_BUDGET_S)
+    parser.add_argument("--budget-rss-mb", type=float, default=STARTUP_RSS_MB)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/status"):
+        print("startup_bench needs /proc (Linux) to read RSS")
+        return 1
+
+    measure_once()  # warm the bytecode and filesystem caches
+    runs = [measure_once() for _ in range(args.runs)]
+    times = [r["import_s"] for r in runs]
+    results = {
+        "commit": git_commit(),
+        "runs": args.runs,
+        "import_p50_s": round(percentile(times, 50), 3),
+        "import_max_s": round(max(times), 3),
+        "rss_mb": round(max(r["rss_mb"] for r in runs), 1),
+        "modules": runs[-1]["modules"],
+        "lazy_loaded": sorted({m for r in runs for m in r["lazy_loaded"]}),
+        "budget": {"import_s": args.budget_s, "rss_mb": args.budget_rss_mb},
+    }
+    print(json.dumps(results, indent=2))
+
+    if not args.check:
+        return 0
+    failures = []
+    if results["import_p50_s"] > args.budget_s:
+        failures.append(f"import took {results['import_p50_s']}s (budget {args.budget_s}s)")
+    if results["rss_mb"] > args.budget_rss_mb:
+        failures.append(f"RSS is {results['rss_mb']} MB (budget {args.budget_rss_mb} MB)")
+    if results["lazy_loaded"]:
+        failures.append("imported at startup: " + ", ".join(results["lazy_loaded"]))
+    for failure in failures:
+        print("FAIL:", failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+
+IMAGES_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+STORAGE_MAX_BYTES = int(os.getenv("STORAGE_MAX_BYTES", str(500 * 1024 * 1024)))
+STORAGE_MAX_AGE = float(os.getenv("STORAGE_MAX_AGE", "0"))
+STORAGE_SWEEP_SECONDS = float(os.getenv("STORAGE_SWEEP_SECONDS", "300"))
+STATES = ("saved", "processed")
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+# files indexed by import_existing (e.g. the sample images tracked in git) are never evicted
+MANAGED = "json_extract(meta, '$.imported') IS NULL"
+
+
+def file_name(digest, ext=".jpg"):
+    return digest[:32] + ext
+
+
+class ImageStore:
+    """Content-addressed image files under images/<state>/ with a SQLite index of state and metadata."""
+
+    def __init__(self, root=IMAGES_ROOT, max_bytes=STORAGE_MAX_BYTES, max_age=STORAGE_MAX_AGE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        for state in STATES:
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "hash TEXT PRIMARY KEY, state TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, meta TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS images_state ON images (state, created)")
+        self._db.commit()
+        if self._db.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 0:
+            self.import_existing()
+        self._sweeper = None
+
+    def _row(self, row):
+        if row is None:
+            return None
+        return {"hash": row[0], "state": row[1], "path": os.path.join(self.root, row[2]), "size": row[3],
+                "created": row[4], "meta": json.loads(row[5] or "{}")}
+
+    def put(self, data, state="saved", meta=None, ext=".jpg", digest=None):
+        """Store encoded image bytes once per content hash and return the index record."""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        with self._lock:
+            existing = self._db.execute("SELECT * FROM images WHERE hash = ?", (digest,)).fetchone()
+            if existing is not None:
+                return self._row(existing)
+            rel = os.path.join(state, file_name(digest, ext))
+            path = os.path.join(self.root, rel)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO images VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, state, rel, len(data), time.time(), json.dumps(meta or {})),
+                )
+            return self._row(self._db.execute("SELECT * FROM images WHERE hash = ?", (digest,)).fetchone())
+
+    def put_frame(self, frame, state="saved", meta=None):
+        import cv2
+
+        ok, buf = cv2.imencode(".jpg", frame)
+        if not ok:
+            return None
+        return self.put(buf.tobytes(), state, meta)
+
+    def move(self, digest, state):
+        """Atomically rename a stored file into another state directory."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM images WHERE hash = ?", (digest,)).fetchone()
+            if row is None or row[1] == state:
+                return self._row(row)
+            rel = os.path.join(state, os.path.basename(row[2]))
+            os.replace(os.path.join(self.root, row[2]), os.path.join(self.root, rel))
+            with self._db:
+                self._db.execute("UPDATE images SET state = ?, path = ? WHERE hash = ?", (state, rel, digest))
+            return self._row(self._db.execute("SELECT * FROM images WHERE hash = ?", (digest,)).fetchone())
+
+    def find(self, path):
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        with self._lock:
+            return self._row(self._db.execute("SELECT * FROM images WHERE path = ?", (rel,)).fetchone())
+
+    def list(self, state="saved", limit=100):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM images WHERE state = ? ORDER BY created LIMIT ?", (state, limit)
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def import_existing(self):
+        """Index files that predate the store (e.g. capture_<epoch>.jpg) without renaming them."""
+        for state in STATES:
+            folder = os.path.join(self.root, state)
+            for entry in os.scandir(folder):
+                if not entry.is_file() or not entry.name.lower().endswith(EXTENSIONS):
+                    continue
+                with open(entry.path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                stat = entry.stat()
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO images VALUES (?, ?, ?, ?, ?, ?)",
+                        (digest, state, os.path.join(state, entry.name), stat.st_size, stat.st_mtime,
+                         json.dumps({"imported": True})),
+                    )
+
+    def _delete(self, rows):
+        for digest, rel in rows:
+            try:
+                os.remove(os.path.join(self.root, rel))
+            except FileNotFoundError:
+                pass
+            self._db.execute("DELETE FROM images WHERE hash = ?", (digest,))
+
+    def enforce_retention(self):
+        """Drop files older than max_age, then the oldest files until the total is within max_bytes.
+
+        Only files the store wrote itself count and are evicted; imported files are left alone.
+        """
+        evicted = 0
+        with self._lock, self._db:
+            if self.max_age > 0:
+                rows = self._db.execute(
+                    f"SELECT hash, path FROM images WHERE created < ? AND {MANAGED}", (time.time() - self.max_age,)
+                ).fetchall()
+                self._delete(rows)
+                evicted += len(rows)
+            if self.max_bytes > 0:
+                total = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM images WHERE {MANAGED}").fetchone()[0]
+                rows = []
+                query = f"SELECT hash, path, size FROM images WHERE {MANAGED} ORDER BY created"
+                for digest, rel, size in self._db.execute(query):
+                    if total <= self.max_bytes:
+                        break
+                    rows.append((digest, rel))
+                    total -= size
+                self._delete(rows)
+                evicted += len(rows)
+        return evicted
+
+    def start_sweeper(self, interval=STORAGE_SWEEP_SECONDS):
+        if self._sweeper is not None:
+            return
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.enforce_retention()
+                except Exception as e:
+                    print(f"Retention error: {e}")
+
+        self._sweeper = threading.Thread(target=sweep, name="image-retention", daemon=True)
+        self._sweeper.start()
+
+    def stats(self):
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*), COALESCE(SUM(size), 0) FROM images GROUP BY state")
+            by_state = {state: {"files": n, "bytes": size} for state, n, size in rows}
+        return {"states": by_state, "max_bytes": self.max_bytes, "max_age": self.max_age}
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ImageStore()
+        return _STORE
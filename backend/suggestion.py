@@ -1,31 +1,40 @@
 import cv2
 import numpy as np
+from preprocess import BRIGHT, DARK, MAX_PIXELS, SOFT_BLUR, limit_pixels
+
+MIN_OCR_SIDE = 1000
 
 def analyze_quality(frame):
+    """(usable, suggestions, blur, brightness); blur and brightness can be passed on as preprocess(quality=...)."""
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     
     # Blur Detection
     blur_score = cv2.Laplacian(gray, cv2.CV_64F).var()
-    is_sharp = blur_score > 80
+    is_sharp = blur_score > SOFT_BLUR
     
     # Lighting Detection
     avg_brightness = np.mean(gray)
-    is_well_lit = 50 < avg_brightness < 230
+    is_well_lit = DARK < avg_brightness < BRIGHT
     
     suggestions = []
     if not is_sharp:
         suggestions.append("Hold steady or move closer. Image looks blurry.")
-    if avg_brightness <= 50:
+    if avg_brightness <= DARK:
         suggestions.append("Low light detected. Increase lighting or avoid shadows.")
-    if avg_brightness >= 230:
+    if avg_brightness >= BRIGHT:
         suggestions.append("Too bright. Reduce glare or move away from light source.")
     
-    return (is_sharp and is_well_lit), suggestions, blur_score
+    return (is_sharp and is_well_lit), suggestions, blur_score, float(avg_brightness)
 
 def get_image(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    # Upscale and Adaptive Threshold for Tesseract
-    resized = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    gray = cv2.cvtColor(limit_pixels(frame), cv2.COLOR_BGR2GRAY)
+    # Upscale small frames only (up to 2x, never past MAX_PIXELS), then Adaptive Threshold for Tesseract
+    h, w = gray.shape[:2]
+    scale = min(2.0, (MAX_PIXELS / float(h * w)) ** 0.5)
+    if min(h, w) < MIN_OCR_SIDE and scale > 1:
+        resized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    else:
+        resized = gray
     processed = cv2.adaptiveThreshold(
         resized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
         cv2.THRESH_BINARY, 11, 2
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the backend modules import each other by bare name, as when app.py is run from backend/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
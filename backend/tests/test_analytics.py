@@ -0,0 +1,35 @@
+import random
+import re
+
+import pytest
+
+import analytics
+
+
+def baseline_keywords(text, top_k=10):
+    # extract_keywords as it was in app.py before analytics.py
+    tokens = [t.lower() for t in re.findall(r"\b[a-zA-Z][a-zA-Z0-9'-]*\b", text)]
+    tokens = [t for t in tokens if t not in analytics.STOP_WORDS and len(t) > 2]
+    counts = {}
+    for t in tokens:
+        counts[t] = counts.get(t, 0) + 1
+    return [k for k, _ in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:top_k]]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("A 10-year-old boy.", ["year-old", "boy"]),
+    ("The 2nd-quarter results", ["quarter", "results"]),
+])
+def test_keywords_hyphenated_digits(text, expected):
+    assert analytics.keywords(text) == expected
+
+
+def test_keywords_match_baseline():
+    rng = random.Random(13)
+    pieces = ["state-of-the-art", "10-year-old", "2nd-quarter", "don't", "o'clock", "foo--bar", "-dash",
+              "trailing-", "café", "naïve", "snake_case", "x1-y2", "Data", "data", "DATA", "ocr", "OCR's",
+              "the", "and", "it", "12", "3.5", "e-mail", "re-use", "It's", "--", "'quoted'", "well-known"]
+    punctuation = [" ", " ", " ", ", ", ". ", "! ", "? ", "\n", " (", ") ", "; ", "\t"]
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) + rng.choice(punctuation) for _ in range(rng.randint(0, 30)))
+        assert analytics.keywords(text) == baseline_keywords(text), text
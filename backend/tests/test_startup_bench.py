@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+import startup_bench
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="startup_bench reads RSS from /proc")
+def test_startup_check_passes(capsys):
+    # the shipped budgets; a slow CI runner sets STARTUP_BUDGET_S / STARTUP_RSS_MB on purpose
+    assert startup_bench.main(["--check", "--runs", "1"]) == 0, capsys.readouterr().err
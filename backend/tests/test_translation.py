@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+
+import translation
+from translation import TranslationCache, split_sentences
+
+
+@pytest.mark.parametrize("text, max_chars, expected", [
+    ("One line\nwrapped over two. Next!", 4500, [("One line\nwrapped over two. Next!", "")]),
+    ("Aaa bbb. Ccc ddd. Eee fff.", 12, [("Aaa bbb.", " "), ("Ccc ddd.", " "), ("Eee fff.", "")]),
+    ("Aaa bbb ccc ddd", 8, [("Aaa bbb", " "), ("ccc ddd", "")]),
+    ("", 4500, [("", "")]),
+])
+def test_split_sentences(text, max_chars, expected):
+    assert split_sentences(text, max_chars) == expected
+
+
+def test_split_sentences_round_trips():
+    text = "First sentence.  Second one?\n\nA line that\nwraps. " + "word " * 2000
+    pieces = split_sentences(text, 500)
+    assert "".join(chunk + sep for chunk, sep in pieces) == text
+    assert all(len(chunk) <= 500 for chunk, _ in pieces)
+
+
+def test_cache_table_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation, "PRUNE_EVERY", 10)
+    path = str(tmp_path / "translations.db")
+    cache = TranslationCache(max_size=5, path=path, max_rows=20)
+    for i in range(100):
+        cache.put(f"k{i}", f"v{i}")
+    keys = {row[0] for row in sqlite3.connect(path).execute("SELECT key FROM translations")}
+    assert keys == {f"k{i}" for i in range(80, 100)}
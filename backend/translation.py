@@ -0,0 +1,258 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+TRANSLATE_BACKEND = os.getenv("TRANSLATE_BACKEND", "google")
+TRANSLATE_CACHE_SIZE = int(os.getenv("TRANSLATE_CACHE_SIZE", "4096"))
+TRANSLATE_CACHE_PATH = os.getenv("TRANSLATE_CACHE_PATH")
+TRANSLATE_CACHE_ROWS = int(os.getenv("TRANSLATE_CACHE_ROWS", "100000"))
+TRANSLATE_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "8"))
+TRANSLATE_LOCAL_LATENCY = float(os.getenv("TRANSLATE_LOCAL_LATENCY", "0"))
+MAX_CHUNK_CHARS = 4500
+PRUNE_EVERY = 256
+
+# only sentence punctuation ends a chunk: OCR wraps sentences over lines, so line breaks stay inside
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class UnsupportedLanguage(ValueError):
+    """The backend does not know the requested language pair; the routes answer 400."""
+
+
+class GoogleBackend:
+    """deep_translator client, one instance per thread and language pair (the client is not thread-safe)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate(self, text, target, source="auto"):
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get((source, target))
+        if client is None:
+            from deep_translator import GoogleTranslator
+            from deep_translator.exceptions import LanguageNotSupportedException
+            try:
+                client = GoogleTranslator(source=source, target=target)
+            except LanguageNotSupportedException as e:
+                raise UnsupportedLanguage(f"Unsupported language: {target}") from e
+            clients[(source, target)] = client
+        return client.translate(text)
+
+
+class LocalBackend:
+    """Offline stand-in that tags text with the target language; used for tests and load runs.
+
+    TRANSLATE_LOCAL_LATENCY adds a fixed blocking delay per call to stand in for a slow upstream.
+    Like GoogleBackend it has no atranslate, so load runs go through the translator pool as
+    production does.
+    """
+
+    def __init__(self, latency=TRANSLATE_LOCAL_LATENCY):
+        self.latency = latency
+
+    def translate(self, text, target, source="auto"):
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{target}] {text}"
+
+
+BACKENDS = {"google": GoogleBackend, "local": LocalBackend}
+
+
+class TranslationCache:
+    def __init__(self, max_size=TRANSLATE_CACHE_SIZE, path=TRANSLATE_CACHE_PATH, max_rows=TRANSLATE_CACHE_ROWS):
+        self.max_size = max_size
+        self.max_rows = max_rows
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?)", (key, value))
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self):
+        # rowid grows with every write, so this keeps the max_rows most recently written translations
+        self._db.execute(
+            "DELETE FROM translations WHERE rowid IN "
+            "(SELECT rowid FROM translations ORDER BY rowid DESC LIMIT -1 OFFSET ?)", (self.max_rows,)
+        )
+
+    def _remember(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _sentences(text, max_chars):
+    """(sentence, separator) pairs; a sentence longer than max_chars is cut at spaces."""
+    start = 0
+    ends = [(m.start(), m.end()) for m in SENTENCE_END.finditer(text)] + [(len(text), len(text))]
+    for end, next_start in ends:
+        sentence, sep = text[start:end], text[end:next_start]
+        start = next_start
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            space = sentence[cut:cut + 1] if sentence[cut:cut + 1].isspace() else ""
+            yield sentence[:cut], space
+            sentence = sentence[cut + len(space):]
+        yield sentence, sep
+
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    """Pack consecutive sentences into (chunk, separator) pairs of up to max_chars each.
+
+    Each chunk is one cache entry and one backend call; joining the pairs gives back the original text.
+    """
+    pieces = []
+    chunk = sep = None
+    for sentence, next_sep in _sentences(text, max_chars):
+        if chunk is not None and len(chunk) + len(sep) + len(sentence) <= max_chars:
+            chunk, sep = chunk + sep + sentence, next_sep
+            continue
+        if chunk is not None:
+            pieces.append((chunk, sep))
+        chunk, sep = sentence, next_sep
+    pieces.append((chunk, sep))
+    return pieces
+
+
+def cache_key(chunk, target):
+    return hashlib.sha1(chunk.encode("utf-8")).hexdigest() + ":" + target
+
+
+class Translator:
+    def __init__(self, backend=None, cache=None, workers=TRANSLATE_WORKERS):
+        self.backend = backend or BACKENDS[TRANSLATE_BACKEND]()
+        self.cache = cache or TranslationCache()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+
+    def _plan(self, text, target):
+        """Split text and fill cached chunks; returns (pieces, out, {cache_key: [piece indexes]})."""
+        pieces = split_sentences(text)
+        out = [None] * len(pieces)
+        pending = {}
+        for i, (chunk, _) in enumerate(pieces):
+            if not chunk.strip():
+                out[i] = chunk
+                continue
+            key = cache_key(chunk, target)
+            cached = self.cache.get(key)
+            if cached is not None:
+                out[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+        return pieces, out, pending
+
+    def _store(self, out, pending, key, translated):
+        # an empty result is usually a failed call; leave it uncached so the next request retries it
+        translated = translated or ""
+        if translated:
+            self.cache.put(key, translated)
+        for i in pending[key]:
+            out[i] = translated
+
+    @metrics.timed("translation")
+    def translate(self, text, target, source="auto"):
+        pieces, out, pending = self._plan(text, target)
+        futures = {
+            key: self._executor.submit(self.backend.translate, pieces[idx[0]][0], target, source)
+            for key, idx in pending.items()
+        }
+        for key, future in futures.items():
+            self._store(out, pending, key, future.result())
+
+        return "".join(chunk + sep for chunk, (_, sep) in zip(out, pieces))
+
+    async def atranslate(self, text, target, source="auto"):
+        """translate() for an event loop: backends with atranslate are awaited, others run on the translator pool.
+
+        Cache lookups and stores run off the loop too, since TRANSLATE_CACHE_PATH makes them SQLite I/O.
+        """
+        with metrics.stage("translation"):
+            pieces, out, pending = await asyncio.to_thread(self._plan, text, target)
+            loop = asyncio.get_running_loop()
+            native = getattr(self.backend, "atranslate", None)
+            calls = []
+            for idx in pending.values():
+                chunk = pieces[idx[0]][0]
+                if native is not None:
+                    calls.append(native(chunk, target, source))
+                else:
+                    calls.append(loop.run_in_executor(self._executor, self.backend.translate, chunk, target, source))
+            results = await asyncio.gather(*calls)
+            if pending:
+                await asyncio.to_thread(self._store_all, out, pending, results)
+
+            return "".join(chunk + sep for chunk, (_, sep) in zip(out, pieces))
+
+    def _store_all(self, out, pending, results):
+        for key, translated in zip(pending, results):
+            self._store(out, pending, key, translated)
+
+
+_TRANSLATOR = None
+_TRANSLATOR_LOCK = threading.Lock()
+
+
+def get_translator():
+    global _TRANSLATOR
+    with _TRANSLATOR_LOCK:
+        if _TRANSLATOR is None:
+            _TRANSLATOR = Translator()
+        return _TRANSLATOR
+
+
+def translate_text(text, target, source="auto"):
+    return get_translator().translate(text, target, source)